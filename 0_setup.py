@@ -26,7 +26,10 @@ from typing import Dict, Any, Optional
 import logging
 
 # Neo4j utils
-from langchain_neo4j import Neo4jGraph
+from utils.graph_stats import (
+    GRAPH_STATS_LABEL, bump_graph_epoch, fetch_graph_stats, update_materialized_aggregates
+)
+from utils.neo4j_connection import create_graph, get_neo4j_settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -74,9 +77,7 @@ class Neo4jStatusChecker:
 
     def __init__(self):
         """Initialize Neo4j status checker with connection parameters."""
-        self.url = "bolt://localhost:7687"
-        self.username = "neo4j"
-        self.password = "password123"
+        self.url = get_neo4j_settings()["url"]
         self.graph = None
 
     def check_connection(self) -> Dict[str, Any]:
@@ -89,11 +90,7 @@ class Neo4jStatusChecker:
 
         try:
             # Attempt to connect
-            self.graph = Neo4jGraph(
-                url=self.url,
-                username=self.username,
-                password=self.password
-            )
+            self.graph = create_graph(refresh_schema=False)
 
             # Try to get version
             try:
@@ -125,34 +122,17 @@ class Neo4jStatusChecker:
                 return {'error': 'Not connected to Neo4j'}
 
         try:
-            # Get total nodes
-            result = self.graph.query("MATCH (n) RETURN count(n) as count")
-            if result:
-                stats['total_nodes'] = result[0].get('count', 0)
-
-            # Get total relationships
-            result = self.graph.query("MATCH ()-[r]->() RETURN count(r) as count")
-            if result:
-                stats['total_relationships'] = result[0].get('count', 0)
-
-            # Get node types and counts
-            result = self.graph.query("""
-                MATCH (n)
-                UNWIND labels(n) as label
-                RETURN label, count(*) as count
-                ORDER BY count DESC
-            """)
-            if result:
-                for row in result:
-                    label = row.get('label')
-                    count = row.get('count', 0)
-                    if label:
-                        stats['node_types'][label] = count
-
-            # Get programmer count (Person nodes)
-            result = self.graph.query("MATCH (p:Person) RETURN count(p) as count")
-            if result:
-                stats['programmers'] = result[0].get('count', 0)
+            # Count-store statistics in a single round trip
+            graph_stats = fetch_graph_stats(self.graph)
+            stats['total_nodes'] = graph_stats['node_count']
+            stats['total_relationships'] = graph_stats['rel_count']
+            stats['node_types'] = dict(sorted(
+                ((label, count) for label, count in graph_stats['labels'].items()
+                 if label != GRAPH_STATS_LABEL),
+                key=lambda item: item[1],
+                reverse=True
+            ))
+            stats['programmers'] = graph_stats['labels'].get('Person', 0)
 
         except Exception as e:
             logger.debug(f"Error getting stats: {e}")
@@ -207,8 +187,11 @@ class Neo4jStatusChecker:
                 return False
 
         try:
-            # Delete all nodes and relationships
-            self.graph.query("MATCH (n) DETACH DELETE n")
+            # Delete all nodes and relationships (keep the epoch node so that
+            # cached answers from before the wipe are invalidated)
+            self.graph.query(f"MATCH (n) WHERE NOT n:{GRAPH_STATS_LABEL} DETACH DELETE n")
+            update_materialized_aggregates(self.graph, [])
+            bump_graph_epoch(self.graph)
             logger.info("Database cleared successfully")
             return True
 
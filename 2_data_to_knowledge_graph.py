@@ -23,7 +23,11 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 from langchain_experimental.graph_transformers import LLMGraphTransformer
 from langchain_openai import AzureChatOpenAI
-from langchain_neo4j import Neo4jGraph
+
+from utils.entity_search import CREATE_FULLTEXT_INDEX, CREATE_KEY_INDEXES, set_entity_keys
+from utils.neo4j_connection import create_graph
+from utils.graph_stats import GRAPH_STATS_LABEL, bump_graph_epoch, update_materialized_aggregates
+from utils.vector_index import create_embeddings, create_vector_indexes, index_documents, index_person_summaries
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +42,7 @@ class DataKnowledgeGraphBuilder:
         self.config = self._load_config(config_path)
         self.setup_neo4j()
         self.setup_llm_transformer()
+        self.setup_embeddings()
 
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from TOML file."""
@@ -52,7 +57,7 @@ class DataKnowledgeGraphBuilder:
     def setup_neo4j(self):
         """Setup Neo4j connection."""
         try:
-            self.graph = Neo4jGraph()
+            self.graph = create_graph(self.config)
             logger.info("✓ Connected to Neo4j successfully")
 
             # Complete cleanup for fresh start
@@ -67,9 +72,12 @@ class DataKnowledgeGraphBuilder:
     def complete_cleanup(self):
         """Perform complete Neo4j database cleanup."""
         try:
-            # Step 1: Delete all nodes and relationships
+            # Step 1: Delete all nodes and relationships (the epoch node survives
+            # so that cached answers from before the cleanup are invalidated)
             logger.info("  - Deleting all nodes and relationships...")
-            self.graph.query("MATCH (n) DETACH DELETE n")
+            self.graph.query(f"MATCH (n) WHERE NOT n:{GRAPH_STATS_LABEL} DETACH DELETE n")
+            update_materialized_aggregates(self.graph, [])
+            bump_graph_epoch(self.graph)
 
             # Step 2: Drop all constraints
             logger.info("  - Dropping all constraints...")
@@ -100,7 +108,9 @@ class DataKnowledgeGraphBuilder:
                         logger.debug(f"    Could not drop index {index_name}: {e}")
 
             # Step 4: Verify cleanup
-            node_count = self.graph.query("MATCH (n) RETURN count(n) as count")[0]['count']
+            node_count = self.graph.query(
+                f"MATCH (n) WHERE NOT n:{GRAPH_STATS_LABEL} RETURN count(n) as count"
+            )[0]['count']
             rel_count = self.graph.query("MATCH ()-[r]->() RETURN count(r) as count")[0]['count']
 
             if node_count == 0 and rel_count == 0:
@@ -112,7 +122,9 @@ class DataKnowledgeGraphBuilder:
             logger.error(f"Error during cleanup: {e}")
             # Fallback to basic cleanup
             logger.info("  - Falling back to basic cleanup...")
-            self.graph.query("MATCH (n) DETACH DELETE n")
+            self.graph.query(f"MATCH (n) WHERE NOT n:{GRAPH_STATS_LABEL} DETACH DELETE n")
+            update_materialized_aggregates(self.graph, [])
+            bump_graph_epoch(self.graph)
 
     def setup_llm_transformer(self):
         """Setup LLM and graph transformer with CV-specific schema."""
@@ -161,6 +173,18 @@ class DataKnowledgeGraphBuilder:
 
         logger.info("✓ LLM Graph Transformer initialized with CV schema")
 
+    def setup_embeddings(self):
+        """Setup the embedding client for the in-graph vector indexes."""
+        self.vector_config = self.config.get('vector_index', {})
+
+        if not self.vector_config.get('enabled', True):
+            self.embeddings = None
+            logger.info("In-graph vector index disabled")
+            return
+
+        self.embeddings = create_embeddings(self.config)
+        logger.info("✓ Embeddings initialized for Person and Document vector indexes")
+
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from PDF using PyPDFLoader (Reliable pure-Python method)."""
         try:
@@ -274,6 +298,31 @@ class DataKnowledgeGraphBuilder:
                 include_source=True    # Include source documents for RAG
             )
 
+            touched_nodes = [
+                {"label": node.type, "id": node.id}
+                for doc in graph_documents for node in doc.nodes
+            ]
+
+            # Normalized lookup keys for index seeks on exact names
+            set_entity_keys(self.graph, [node["id"] for node in touched_nodes])
+            logger.info("✓ Normalized entity keys written")
+
+            # Maintain person_count on the nodes touched by this batch
+            update_materialized_aggregates(self.graph, touched_nodes)
+            logger.info("✓ Materialized aggregate counters updated")
+
+            # Embed person summaries and source documents for hybrid retrieval
+            if self.embeddings:
+                batch_size = self.vector_config.get('batch_size', 64)
+                person_ids = [node["id"] for node in touched_nodes if node["label"] == "Person"]
+                people = index_person_summaries(self.graph, self.embeddings, person_ids, batch_size)
+                documents = index_documents(self.graph, self.embeddings)
+                logger.info(f"✓ Embedded {people} person summaries and {documents} documents")
+
+            # Invalidate cached answers computed against the previous data
+            epoch = bump_graph_epoch(self.graph)
+            logger.info(f"✓ Graph epoch advanced to {epoch}")
+
             # Calculate and log statistics
             total_nodes = sum(len(doc.nodes) for doc in graph_documents)
             total_relationships = sum(len(doc.relationships) for doc in graph_documents)
@@ -295,7 +344,11 @@ class DataKnowledgeGraphBuilder:
             "CREATE INDEX person_name IF NOT EXISTS FOR (p:Person) ON (p.id)",
             "CREATE INDEX company_name IF NOT EXISTS FOR (c:Company) ON (c.id)",
             "CREATE INDEX skill_name IF NOT EXISTS FOR (s:Skill) ON (s.id)",
-            "CREATE INDEX entity_base IF NOT EXISTS FOR (e:__Entity__) ON (e.id)"
+            "CREATE INDEX entity_base IF NOT EXISTS FOR (e:__Entity__) ON (e.id)",
+            # Fuzzy, typo-tolerant name lookups via db.index.fulltext.queryNodes
+            CREATE_FULLTEXT_INDEX,
+            # Exact lookups on the normalized key property
+            *CREATE_KEY_INDEXES
         ]
 
         for index_query in indexes:
@@ -305,6 +358,13 @@ class DataKnowledgeGraphBuilder:
             except Exception as e:
                 logger.debug(f"Index might already exist: {e}")
 
+        if self.embeddings:
+            try:
+                create_vector_indexes(self.graph, self.vector_config.get('dimensions', 1536))
+                logger.debug("Created vector indexes")
+            except Exception as e:
+                logger.warning(f"Could not create vector indexes: {e}")
+
     def validate_graph(self):
         """Validate the created knowledge graph."""
         logger.info("Validating knowledge graph...")
@@ -12,13 +12,38 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 import os
-from typing import List, Dict, Any
+import sys
+import json
+import time
+import argparse
+import asyncio
+from typing import List, Dict, Any, AsyncIterator, TextIO, Tuple
 import logging
+import toml
 
-from langchain_neo4j import Neo4jGraph, GraphCypherQAChain
+from neo4j import Query
+from langchain_neo4j import GraphCypherQAChain
+from langchain_neo4j.chains.graph_qa.cypher import extract_cypher
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts.prompt import PromptTemplate
 
+from utils.answer_cache import AnswerCache
+from utils.answer_renderer import render_answer
+from utils.context_budget import ContextBudgeter
+from utils.cypher_guard import CypherGuard
+from utils.cypher_params import prepare_generated_cypher
+from utils.graph_stats import (
+    GRAPH_STATS_LABEL, GRAPH_EPOCH_QUERY, HIDDEN_LABELS, get_graph_epoch, bump_graph_epoch,
+    fetch_graph_stats, recompute_materialized_aggregates
+)
+from utils.entity_search import ENTITY_FULLTEXT_INDEX, ensure_entity_keys, normalize_key, search_entities
+from utils.intent_router import IntentRouter
+from utils.prompt_builder import PromptBuilder
+from utils.query_profiler import QueryProfiler
+from utils.neo4j_connection import create_graph, create_driver, create_async_driver, get_neo4j_settings
+from utils.schema_snapshot import load_or_refresh_schema
+from utils.vector_index import create_embeddings, hybrid_search
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,25 +56,76 @@ class CVGraphRAGSystem:
     including Person nodes with skills, education, work experience, and certifications.
     """
 
-    def __init__(self):
+    def __init__(self, config_path: str = "utils/config.toml"):
         """Initialize the GraphRAG system."""
+        self.config = self._load_config(config_path)
+        self.setup_cypher_guard()
         self.setup_neo4j()
         self.setup_qa_chain()
+        self.setup_answer_cache()
+        self.setup_query_profiler()
+        self.setup_intent_router()
+        self.setup_vector_search()
         self.load_example_queries()
 
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from TOML file."""
+        if not os.path.exists(config_path):
+            raise ValueError(f"Configuration file not found: {config_path}")
+
+        with open(config_path, 'r') as f:
+            config = toml.load(f)
+
+        return config
+
+    def setup_cypher_guard(self):
+        """Setup the EXPLAIN-based cost guard for generated Cypher."""
+        guard_config = self.config.get('cypher_guard', {})
+
+        # Server-side transaction timeout applies to every query, guarded or not
+        self.transaction_timeout = guard_config.get('transaction_timeout_seconds', 15)
+
+        if not guard_config.get('enabled', True):
+            self.cypher_guard = None
+            logger.info("Cypher cost guard disabled")
+            return
+
+        self.cypher_guard = CypherGuard(
+            max_estimated_rows=guard_config.get('max_estimated_rows', 100000),
+            default_limit=guard_config.get('default_limit', 200),
+            allow_writes=guard_config.get('allow_writes', False),
+            database=get_neo4j_settings()['database']
+        )
+        logger.info("✓ Cypher cost guard initialized")
+
     def setup_neo4j(self):
         """Setup Neo4j connection."""
+        self.database = get_neo4j_settings()['database']
+        self._async_driver = None  # Created lazily inside the running event loop
+        self._loop = None  # One event loop for the whole session, see _run_async
+
         try:
-            self.graph = Neo4jGraph(
-                url="bolt://localhost:7687",
-                username="neo4j",
-                password="password123"
+            self.graph = create_graph(
+                self.config,
+                timeout=self.transaction_timeout,
+                refresh_schema=False  # Loaded from the snapshot below
             )
-            logger.info("✓ Connected to Neo4j successfully")
+            # Own driver for EXPLAIN/PROFILE and timed queries (graph._driver is private)
+            self.driver = create_driver(self.config)
+            logger.info(f"✓ Connected to Neo4j successfully ({get_neo4j_settings()['url']})")
 
-            # Refresh schema for accurate query generation
-            self.graph.refresh_schema()
-            logger.info("✓ Graph schema refreshed")
+            # Graphs loaded from a dump lack the data derived at ingestion
+            if self.config.get('graph_rag', {}).get('backfill_on_startup', True):
+                self.backfill_graph()
+
+            # Reuse the persisted schema unless the graph changed since it was taken
+            snapshot_path = self.config.get('graph_rag', {}).get(
+                'schema_snapshot', '.cache/graph_schema.json'
+            )
+            if load_or_refresh_schema(self.graph, snapshot_path):
+                logger.info("✓ Graph schema loaded from snapshot")
+            else:
+                logger.info("✓ Graph schema refreshed")
 
         except Exception as e:
             logger.error(f"Failed to connect to Neo4j: {e}")
@@ -57,6 +133,25 @@ class CVGraphRAGSystem:
             print("   ./start_session.sh")
             raise
 
+    def backfill_graph(self) -> None:
+        """Add ingestion-derived data missing from graphs built elsewhere (e.g. the Neo4j dump).
+
+        The generated Cypher matches entities on their normalized `key` and the
+        templates rank by person_count; without them queries return no rows.
+        Idempotent: only nodes without a key / person_count are written, so once
+        a graph is complete this is a cheap check.
+        """
+        try:
+            updated = ensure_entity_keys(self.graph)
+            updated += recompute_materialized_aggregates(self.graph, missing_only=True)
+        except Exception as e:
+            logger.warning(f"Could not backfill entity keys and materialized aggregates: {e}")
+            return
+
+        if updated:
+            # Cached answers and the schema snapshot predate the backfill
+            bump_graph_epoch(self.graph)
+
     def setup_qa_chain(self):
         """Setup the GraphCypherQA chain."""
         # Initialize LLM for query generation
@@ -71,8 +166,16 @@ class CVGraphRAGSystem:
 Instructions:
 Use only the provided relationship types and properties in the schema.
 Do not use any other relationship types or properties that are not provided.
-For skill matching, always use case-insensitive comparison using toLower() function.
+Never inline names or other values from the question: use $parameters and put their values on a final line
+// params: {{"name": value, ...}}
+To match an entity by name, compare its key property with a parameter holding the normalized name
+(lowercase, with spaces and punctuation removed, e.g. "Node.js" -> "nodejs", "Machine Learning" -> "machinelearning").
+Never use toLower() on node properties: the key property is indexed.
+If a name may be misspelled or abbreviated, resolve it first through the full-text index
+"{fulltext_index}" with db.index.fulltext.queryNodes, appending ~ to each word of the parameter for fuzzy matching.
 For count queries, ensure you return meaningful column names.
+Skill, Company, University, Location and Certification nodes have a precomputed person_count property
+(number of people connected to them). Use it for "most common" / "most people" questions instead of counting relationships.
 
 Schema:
 {schema}
@@ -83,27 +186,15 @@ Do not include any text except the generated Cypher statement.
 
 Examples: Here are a few examples of generated Cypher statements for particular questions:
 
-# How many Python programmers do we have?
-MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)
-WHERE toLower(s.id) = toLower("Python")
-RETURN count(p) AS pythonProgrammers
-
-# Who has React skills?
-MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)
-WHERE toLower(s.id) = toLower("React")
-RETURN p.id AS name
-
-# Find people with both Python and Django skills
-MATCH (p:Person)-[:HAS_SKILL]->(s1:Skill), (p)-[:HAS_SKILL]->(s2:Skill)
-WHERE toLower(s1.id) = toLower("Python") AND toLower(s2.id) = toLower("Django")
-RETURN p.id AS name
+{examples}
 
 The question is:
 {question}"""
 
         CYPHER_GENERATION_PROMPT = PromptTemplate(
-            input_variables=["schema", "question"],
-            template=CYPHER_GENERATION_TEMPLATE
+            input_variables=["schema", "question", "examples"],
+            template=CYPHER_GENERATION_TEMPLATE,
+            partial_variables={"fulltext_index": ENTITY_FULLTEXT_INDEX}
         )
 
         # Custom QA prompt for better handling of numeric results
@@ -117,6 +208,8 @@ Guidelines:
 - If the information is empty or null, then say you don't know the answer.
 - Use the provided information to construct a helpful answer.
 - Be specific and mention actual names, numbers, or details from the information.
+- If the information ends with a truncated_result_summary, the list is partial: use its total_rows for counts and say that only some entries are listed.
+- If that summary has limited: true, the query hit its row limit, so total_rows is only a lower bound: say "at least [total_rows]", never an exact total.
 
 Information:
 {context}
@@ -137,11 +230,131 @@ Helpful Answer:"""
             cypher_prompt=CYPHER_GENERATION_PROMPT,
             qa_prompt=CYPHER_QA_PROMPT,
             return_intermediate_steps=True,
-            allow_dangerous_requests=True  # Allow DELETE operations for demo
+            exclude_types=[GRAPH_STATS_LABEL],  # Bookkeeping node, not CV data
+            allow_dangerous_requests=True  # Writes are rejected by the Cypher guard instead
+        )
+
+        # Keep QA prompts bounded for listing questions with many rows
+        budget_config = self.config.get('qa_context', {})
+        self.context_budgeter = ContextBudgeter(
+            max_tokens=budget_config.get('max_tokens', 2000),
+            max_rows=budget_config.get('max_rows', 100),
+            max_value_chars=budget_config.get('max_value_chars', 300)
+        )
+
+        # Per-question schema pruning and few-shot selection for Cypher generation
+        graph_rag_config = self.config.get('graph_rag', {})
+        self.prompt_builder = PromptBuilder(
+            k=graph_rag_config.get('few_shot_examples', 4),
+            prune_schema=graph_rag_config.get('prune_schema', True),
+            exclude_types=(GRAPH_STATS_LABEL, "__Entity__")
         )
 
         logger.info("✓ GraphCypher QA chain initialized with custom prompts")
 
+    def setup_answer_cache(self):
+        """Setup the graph-epoch-aware answer cache."""
+        cache_config = self.config.get('answer_cache', {})
+
+        if not cache_config.get('enabled', True):
+            self.answer_cache = None
+            logger.info("Answer cache disabled")
+            return
+
+        self.answer_cache = AnswerCache(
+            path=cache_config.get('path', '.cache/answer_cache.sqlite'),
+            ttl_seconds=cache_config.get('ttl_seconds', 86400),
+            max_entries=cache_config.get('max_entries', 5000)
+        )
+        logger.info(f"✓ Answer cache ready ({self.answer_cache.path})")
+
+    def setup_query_profiler(self):
+        """Setup the slow-query profiling log for executed Cypher."""
+        profiler_config = self.config.get('query_profiler', {})
+
+        if not profiler_config.get('enabled', True):
+            self.query_profiler = None
+            logger.info("Query profiler disabled")
+            return
+
+        self.query_profiler = QueryProfiler(
+            log_path=profiler_config.get('log_path', '.cache/query_profile.log'),
+            max_bytes=profiler_config.get('max_bytes', 5_000_000),
+            backup_count=profiler_config.get('backup_count', 3),
+            profile=profiler_config.get('profile_db_hits', False),
+            slow_threshold_ms=profiler_config.get('slow_threshold_ms', 1000),
+            database=self.database
+        )
+        logger.info(f"✓ Query profiler logging to {self.query_profiler.log_path}")
+
+    def setup_intent_router(self):
+        """Setup the template router that answers common questions without the LLM."""
+        graph_rag_config = self.config.get('graph_rag', {})
+
+        if not graph_rag_config.get('intent_router', True):
+            self.intent_router = None
+            logger.info("Intent router disabled")
+            return
+
+        def fuzzy_entity_search(label: str, text: str) -> List[str]:
+            try:
+                return [row["id"] for row in search_entities(self.graph, text, label)]
+            except Exception as e:
+                logger.debug(f"Full-text entity search unavailable: {e}")
+                return []
+
+        self.intent_router = IntentRouter(entity_search=fuzzy_entity_search)
+        logger.info("✓ Intent router initialized")
+
+    def setup_vector_search(self):
+        """Setup query embeddings for hybrid (vector + graph) retrieval."""
+        self.vector_config = self.config.get('vector_index', {})
+
+        if not self.vector_config.get('enabled', True):
+            self.embeddings = None
+            logger.info("Hybrid vector search disabled")
+            return
+
+        self.embeddings = create_embeddings(self.config)
+        logger.info("✓ Hybrid vector search initialized")
+
+    def hybrid_query(self, text: str, top_k: int = 10, target: str = "person", skills: List[str] = None,
+                     company: str = None, location: str = None, certification: str = None) -> List[Dict[str, Any]]:
+        """Find people semantically similar to a text, restricted by graph filters.
+
+        The vector top-k and the structural filters run in a single Cypher query
+        against the in-graph Person summary (or source Document) vector index.
+
+        Args:
+            text: Free-text description ("backend engineer with payments experience")
+            top_k: Number of people to return
+            target: "person" to search person summaries, "document" to search CV texts
+            skills: Skills every returned person must have
+            company: Company the person must have worked at
+            location: Location the person must be in
+            certification: Certification name fragment the person must hold
+
+        Returns:
+            List of {"name", "score", "evidence"} rows, best match first
+        """
+        if self.embeddings is None:
+            raise ValueError("Hybrid search requires [vector_index] to be enabled in config.toml")
+
+        filters = {
+            "skills": [normalize_key(skill) for skill in skills or []],
+            "company": normalize_key(company) if company else None,
+            "location": normalize_key(location) if location else None,
+            "certification": normalize_key(certification) if certification else None,
+        }
+        return hybrid_search(
+            self.graph,
+            self.embeddings.embed_query(text),
+            top_k=top_k,
+            candidates=self.vector_config.get('candidates', 50),
+            target=target,
+            filters=filters
+        )
+
     def load_example_queries(self):
         """Load example queries that demonstrate GraphRAG capabilities for CV data."""
         self.example_queries = {
@@ -227,6 +440,24 @@ Helpful Answer:"""
             ]
         }
 
+    def _build_cypher_prompt(self, question: str):
+        """Build the slimmed Cypher generation inputs (relevant schema, similar examples)."""
+        vocabulary = self.intent_router.vocabulary if self.intent_router else None
+        return self.prompt_builder.build(
+            question, self.graph.structured_schema, self.qa_chain.graph_schema, vocabulary
+        )
+
+    @staticmethod
+    def _cap_rows(rows: List[Dict[str, Any]], limit: int = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Drop the extra row fetched past the guard's LIMIT.
+
+        Returns:
+            Tuple of (rows, whether the result was capped)
+        """
+        if limit is not None and len(rows) > limit:
+            return rows[:limit], True
+        return rows, False
+
     def query_graph(self, question: str) -> Dict[str, Any]:
         """Execute a natural language query against the graph.
 
@@ -239,16 +470,76 @@ Helpful Answer:"""
         try:
             logger.info(f"Executing query: {question}")
 
-            # Execute the query
-            result = self.qa_chain.invoke({"query": question})
-
-            # Extract components
-            response = {
-                "question": question,
-                "answer": result.get("result", "No answer generated"),
-                "cypher_query": result.get("intermediate_steps", [{}])[0].get("query", ""),
-                "success": True
-            }
+            # The graph epoch keys the answer cache and the router vocabulary
+            epoch = get_graph_epoch(self.graph) if self.answer_cache or self.intent_router else None
+
+            # Serve repeated questions from cache while the graph is unchanged
+            if self.answer_cache:
+                cached = self.answer_cache.get(question, epoch)
+                if cached:
+                    logger.info("✓ Answer served from cache")
+                    return {**cached, "cached": True}
+
+            # Answer common question shapes from parameterized templates
+            route = None
+            if self.intent_router:
+                self.intent_router.load_vocabulary(self.graph, epoch)
+                route = self.intent_router.route(question)
+
+            if route:
+                logger.info(f"✓ Routed to template: {route['intent']}")
+                rows = self._run_cypher(route["cypher"], route["params"], question, "template")
+                response = {
+                    "question": question,
+                    "answer": self.intent_router.format_answer(route, rows),
+                    "cypher_query": route["cypher"],
+                    "cypher_params": route["params"],
+                    "success": True,
+                    "intent": route["intent"],
+                    "answer_mode": "template"
+                }
+            else:
+                # Generate Cypher with the LLM and execute it
+                prompt_inputs, prompt_report = self._build_cypher_prompt(question)
+                generated = self.qa_chain.cypher_generation_chain.invoke(prompt_inputs)
+                cypher_query, cypher_params = prepare_generated_cypher(extract_cypher(generated))
+                limit_applied = None
+                if cypher_query and self.cypher_guard:
+                    cypher_query, limit_applied = self.cypher_guard.check(
+                        self.driver, cypher_query, cypher_params
+                    )
+                rows = self._run_cypher(
+                    cypher_query, cypher_params, question=question, source="llm"
+                ) if cypher_query else []
+                rows, truncated = self._cap_rows(rows, limit_applied)
+
+                # Simple results are formatted directly; only complex ones need the QA LLM
+                answer = render_answer(rows, limited=truncated)
+                answer_mode = "rendered"
+                context_report = None
+                if answer is None:
+                    context, context_report = self.context_budgeter.fit(rows, limited=truncated)
+                    answer = self.qa_chain.qa_chain.invoke(
+                        {"question": question, "context": context}
+                    )
+                    answer = getattr(answer, "content", answer)
+                    answer_mode = "llm"
+
+                response = {
+                    "question": question,
+                    "answer": answer or "No answer generated",
+                    "cypher_query": cypher_query,
+                    "cypher_params": cypher_params,
+                    "limit_applied": limit_applied,
+                    "results_truncated": truncated,
+                    "success": True,
+                    "answer_mode": answer_mode,
+                    "context_report": context_report,
+                    "prompt_report": prompt_report
+                }
+
+            if self.answer_cache:
+                self.answer_cache.put(question, epoch, response)
 
             logger.info(f"✓ Query executed successfully")
             return response
@@ -262,6 +553,333 @@ Helpful Answer:"""
                 "success": False
             }
 
+    def _get_async_driver(self):
+        """Return the async Neo4j driver, creating it in the running event loop."""
+        if self._async_driver is None:
+            self._async_driver = create_async_driver(self.config)
+        return self._async_driver
+
+    async def _aquery(self, cypher: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run a Cypher query through the async Neo4j driver."""
+        records, _, _ = await self._get_async_driver().execute_query(
+            Query(cypher, timeout=self.transaction_timeout), params or {}, database_=self.database
+        )
+        return [record.data() for record in records]
+
+    def _run_cypher(self, cypher: str, params: Dict[str, Any] = None, question: str = None,
+                    source: str = None) -> List[Dict[str, Any]]:
+        """Execute an answering query, recording it in the profiling log."""
+        if not self.query_profiler:
+            return self.graph.query(cypher, params or {})
+        return self.query_profiler.run(
+            self.driver, cypher, params, question=question, source=source, timeout=self.transaction_timeout
+        )
+
+    async def _arun_cypher(self, cypher: str, params: Dict[str, Any] = None, question: str = None,
+                           source: str = None) -> List[Dict[str, Any]]:
+        """Async counterpart of _run_cypher."""
+        if not self.query_profiler:
+            return await self._aquery(cypher, params)
+        return await self.query_profiler.arun(
+            self._get_async_driver(), cypher, params, question=question, source=source,
+            timeout=self.transaction_timeout
+        )
+
+    async def _aget_graph_epoch(self) -> int:
+        """Async counterpart of get_graph_epoch."""
+        rows = await self._aquery(GRAPH_EPOCH_QUERY)
+        return rows[0]["epoch"] if rows and rows[0]["epoch"] is not None else 0
+
+    def _run_async(self, coroutine):
+        """Run a coroutine on the session's event loop.
+
+        The async Neo4j driver and the LLM's cached async HTTP client stay bound
+        to the loop they were first used on, so every CLI call shares one loop
+        instead of creating a new one with asyncio.run.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
+
+    def close(self) -> None:
+        """Close the async driver, the session's event loop and the Neo4j driver."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+        self.driver.close()
+
+    async def aclose(self) -> None:
+        """Close the async driver (call before the event loop shuts down)."""
+        if self._async_driver is not None:
+            await self._async_driver.close()
+            self._async_driver = None
+
+    async def astream_query_graph(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a natural language query, yielding output as soon as it exists.
+
+        Mirrors query_graph, but runs the LLM calls and the Cypher asynchronously
+        and yields events instead of a single result:
+
+        - {"type": "cypher", "cypher": ...} once the query is known,
+        - {"type": "token", "text": ...} for each piece of the answer (QA tokens via `astream`),
+        - {"type": "result", "result": ...} last, with the full response and its timings.
+
+        Args:
+            question: Natural language question
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - start) * 1000, 1)
+
+        def mark(event: Dict[str, Any]) -> Dict[str, Any]:
+            if event["type"] == "cypher":
+                timings.setdefault("time_to_cypher_ms", elapsed_ms())
+            elif event["type"] == "token":
+                timings.setdefault("time_to_first_token_ms", elapsed_ms())
+            timings.setdefault("time_to_first_output_ms", elapsed_ms())
+            return event
+
+        try:
+            logger.info(f"Executing query: {question}")
+
+            epoch = await self._aget_graph_epoch() if self.answer_cache or self.intent_router else None
+            if self.answer_cache:
+                cached = self.answer_cache.get(question, epoch)
+                if cached:
+                    logger.info("✓ Answer served from cache")
+                    yield mark({"type": "cypher", "cypher": cached.get("cypher_query", ""),
+                                "params": cached.get("cypher_params")})
+                    yield mark({"type": "token", "text": cached["answer"]})
+                    timings["total_ms"] = elapsed_ms()
+                    yield {"type": "result", "result": {**cached, "cached": True, "timings": timings}}
+                    return
+
+            route = None
+            if self.intent_router:
+                await asyncio.to_thread(self.intent_router.load_vocabulary, self.graph, epoch)
+                route = await asyncio.to_thread(self.intent_router.route, question)
+
+            if route:
+                logger.info(f"✓ Routed to template: {route['intent']}")
+                yield mark({"type": "cypher", "cypher": route["cypher"], "params": route["params"]})
+                rows = await self._arun_cypher(route["cypher"], route["params"], question, "template")
+                answer = self.intent_router.format_answer(route, rows)
+                yield mark({"type": "token", "text": answer})
+                response = {
+                    "question": question,
+                    "answer": answer,
+                    "cypher_query": route["cypher"],
+                    "cypher_params": route["params"],
+                    "success": True,
+                    "intent": route["intent"],
+                    "answer_mode": "template"
+                }
+            else:
+                # Same steps as the sync path, each awaited
+                prompt_inputs, prompt_report = self._build_cypher_prompt(question)
+                generated = await self.qa_chain.cypher_generation_chain.ainvoke(prompt_inputs)
+                cypher_query, cypher_params = prepare_generated_cypher(extract_cypher(generated))
+                limit_applied = None
+                if cypher_query and self.cypher_guard:
+                    cypher_query, limit_applied = await self.cypher_guard.acheck(
+                        self._get_async_driver(), cypher_query, cypher_params
+                    )
+                yield mark({"type": "cypher", "cypher": cypher_query, "params": cypher_params})
+                rows = await self._arun_cypher(
+                    cypher_query, cypher_params, question=question, source="llm"
+                ) if cypher_query else []
+                rows, truncated = self._cap_rows(rows, limit_applied)
+
+                answer = render_answer(rows, limited=truncated)
+                answer_mode = "rendered"
+                context_report = None
+                if answer is None:
+                    context, context_report = self.context_budgeter.fit(rows, limited=truncated)
+                    chunks = []
+                    async for chunk in self.qa_chain.qa_chain.astream(
+                        {"question": question, "context": context}
+                    ):
+                        text = getattr(chunk, "content", chunk)
+                        if text:
+                            chunks.append(text)
+                            yield mark({"type": "token", "text": text})
+                    answer = "".join(chunks)
+                    answer_mode = "llm"
+                else:
+                    yield mark({"type": "token", "text": answer})
+
+                response = {
+                    "question": question,
+                    "answer": answer or "No answer generated",
+                    "cypher_query": cypher_query,
+                    "cypher_params": cypher_params,
+                    "limit_applied": limit_applied,
+                    "results_truncated": truncated,
+                    "success": True,
+                    "answer_mode": answer_mode,
+                    "context_report": context_report,
+                    "prompt_report": prompt_report
+                }
+
+            if self.answer_cache:
+                self.answer_cache.put(question, epoch, response)
+
+            timings["total_ms"] = elapsed_ms()
+            logger.info(
+                f"✓ Query executed successfully (first output after "
+                f"{timings.get('time_to_first_output_ms', 0):.0f} ms, total {timings['total_ms']:.0f} ms)"
+            )
+            yield {"type": "result", "result": {**response, "timings": timings}}
+
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            yield {"type": "result", "result": {
+                "question": question,
+                "answer": f"Error: {str(e)}",
+                "cypher_query": "",
+                "success": False
+            }}
+
+    async def aquery_graph(self, question: str) -> Dict[str, Any]:
+        """Execute a natural language query without blocking the event loop.
+
+        Args:
+            question: Natural language question
+
+        Returns:
+            Dict containing query results and metadata
+        """
+        async for event in self.astream_query_graph(question):
+            if event["type"] == "result":
+                return event["result"]
+
+    async def arun_queries(self, questions: List[str], concurrency: int = None) -> List[Dict[str, Any]]:
+        """Run many questions concurrently with a bounded number in flight.
+
+        Args:
+            questions: Natural language questions
+            concurrency: Maximum concurrent queries (defaults to config value)
+
+        Returns:
+            List of query results in the same order as the questions
+        """
+        if concurrency is None:
+            concurrency = self.config.get('graph_rag', {}).get('max_concurrency', 8)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        # Load the router vocabulary once instead of in every concurrent query
+        if self.intent_router:
+            epoch = await self._aget_graph_epoch()
+            await asyncio.to_thread(self.intent_router.load_vocabulary, self.graph, epoch)
+
+        async def run_one(question: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aquery_graph(question)
+
+        return await asyncio.gather(*(run_one(question) for question in questions))
+
+    def run_example_queries_concurrently(self, category: str = None, concurrency: int = None) -> List[Dict[str, Any]]:
+        """Run example queries concurrently and print them in their original order.
+
+        Args:
+            category: Optional category to filter queries
+            concurrency: Maximum concurrent queries (defaults to config value)
+
+        Returns:
+            List of query results
+        """
+        categories_to_run = [category] if category else list(self.example_queries.keys())
+        questions = []
+        for cat in categories_to_run:
+            if cat not in self.example_queries:
+                logger.warning(f"Category '{cat}' not found")
+                continue
+            questions.extend((cat, question) for question in self.example_queries[cat])
+
+        start_time = time.time()
+        results = self._run_async(self.arun_queries([question for _, question in questions], concurrency))
+        wall_time = time.time() - start_time
+
+        current_category = None
+        for (cat, question), result in zip(questions, results):
+            if cat != current_category:
+                current_category = cat
+                print(f"\n{'='*60}")
+                print(f"Category: {cat}")
+                print(f"{'='*60}")
+
+            print(f"\n🔍 Query: {question}")
+            print("-" * 40)
+            if result["success"]:
+                print(f"📊 Generated Cypher: {result['cypher_query']}")
+                print(f"💡 Answer: {result['answer']}")
+            else:
+                print(f"❌ Error: {result['answer']}")
+
+        print(f"\n⏱️  {len(results)} queries finished in {wall_time:.1f}s")
+        return results
+
+    async def astream_batch(self, questions: List[str], concurrency: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Answer a batch of questions, yielding each result as soon as it completes.
+
+        Identical questions (after whitespace normalization) are executed once;
+        their result lists every input line they appeared on. Blank lines and
+        lines starting with # are skipped but still counted.
+
+        Args:
+            questions: Input lines in order (questions, comments, blank lines)
+            concurrency: Maximum concurrent queries (defaults to config value)
+        """
+        if concurrency is None:
+            concurrency = self.config.get('graph_rag', {}).get('max_concurrency', 8)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        lines: Dict[str, List[int]] = {}
+        for line_number, question in enumerate(questions, 1):
+            question = " ".join(question.split())
+            if question and not question.startswith("#"):
+                lines.setdefault(question, []).append(line_number)
+
+        if self.intent_router:
+            epoch = await self._aget_graph_epoch()
+            await asyncio.to_thread(self.intent_router.load_vocabulary, self.graph, epoch)
+
+        async def run_one(question: str) -> Dict[str, Any]:
+            async with semaphore:
+                result = await self.aquery_graph(question)
+            return {**result, "lines": lines[question]}
+
+        for task in asyncio.as_completed([run_one(question) for question in lines]):
+            yield await task
+
+    def run_question_batch(self, input_file: TextIO, output_file: TextIO, concurrency: int = None) -> int:
+        """Run questions from a file (one per line) and write JSONL results.
+
+        Args:
+            input_file: Open file or stdin with one question per line
+            output_file: Open file or stdout receiving one JSON object per result
+            concurrency: Maximum concurrent queries (defaults to config value)
+
+        Returns:
+            int: Number of failed questions
+        """
+        # Raw lines, so reported line numbers match the input file
+        questions = input_file.read().splitlines()
+
+        async def run_all() -> int:
+            failed = 0
+            start = time.perf_counter()
+            async for result in self.astream_batch(questions, concurrency):
+                failed += not result["success"]
+                output_file.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+                output_file.flush()
+            logger.info(f"✓ Batch finished in {time.perf_counter() - start:.2f}s ({failed} failed)")
+            return failed
+
+        return self._run_async(run_all())
+
     def run_example_queries(self, category: str = None) -> List[Dict[str, Any]]:
         """Run example queries to demonstrate GraphRAG capabilities.
 
@@ -302,7 +920,7 @@ Helpful Answer:"""
         return results
 
     def custom_query(self, question: str) -> None:
-        """Execute a custom user query.
+        """Execute a custom user query, streaming the Cypher and answer as they arrive.
 
         Args:
             question: User's natural language question
@@ -310,87 +928,92 @@ Helpful Answer:"""
         print(f"\n🔍 Custom Query: {question}")
         print("-" * 50)
 
-        result = self.query_graph(question)
+        async def stream() -> Dict[str, Any]:
+            answer_started = False
+            async for event in self.astream_query_graph(question):
+                if event["type"] == "cypher":
+                    print(f"📊 Generated Cypher: {event['cypher']}", flush=True)
+                    if event.get("params"):
+                        print(f"🔧 Parameters: {event['params']}", flush=True)
+                elif event["type"] == "token":
+                    if not answer_started:
+                        print("💡 Answer: ", end="", flush=True)
+                        answer_started = True
+                    print(event["text"], end="", flush=True)
+                else:
+                    if answer_started:
+                        print()
+                    return event["result"]
+
+        # Shared session loop: asyncio.run per question would break the async clients
+        result = self._run_async(stream())
 
-        if result["success"]:
-            print(f"📊 Generated Cypher: {result['cypher_query']}")
-            print(f"💡 Answer: {result['answer']}")
-        else:
+        if not result["success"]:
             print(f"❌ Error: {result['answer']}")
+            return
+
+        if result.get("results_truncated"):
+            print(f"ℹ️  Results capped at {result['limit_applied']} rows (LIMIT added by the Cypher guard)")
+        if result.get("timings"):
+            timings = result["timings"]
+            print(f"⏱️  First output after {timings['time_to_first_output_ms']:.0f} ms, "
+                  f"complete after {timings['total_ms']:.0f} ms")
+
+    def get_graph_stats(self, max_age: float = None) -> Dict[str, Any]:
+        """Return graph statistics, fetched in one round trip and cached briefly.
+
+        Args:
+            max_age: Maximum age of the cached statistics in seconds (defaults to config value)
+
+        Returns:
+            Dict with label and relationship type counts, totals and sample data
+        """
+        if max_age is None:
+            max_age = self.config.get('graph_rag', {}).get('stats_ttl_seconds', 60)
+
+        cached = getattr(self, "_graph_stats", None)
+        if cached and time.time() - cached[0] <= max_age:
+            return cached[1]
+
+        stats = fetch_graph_stats(self.graph)
+        self._graph_stats = (time.time(), stats)
+        return stats
 
     def validate_graph_content(self) -> bool:
         """Validate that the graph has content for querying."""
-        # First, get all available node labels
-        try:
-            labels_result = self.graph.query(
-                "CALL db.labels() YIELD label RETURN label ORDER BY label"
-            )
-            available_labels = [row["label"] for row in labels_result if row["label"] != "__Entity__"]
-        except:
-            available_labels = []
-
-        # Build validation queries based on available labels
-        validation_queries = [
-            ("Total nodes", "MATCH (n) RETURN count(n) as count"),
-            ("Total relationships", "MATCH ()-[r]->() RETURN count(r) as count")
-        ]
-
-        # Add queries for available node types
-        common_labels = ["Person", "Company", "Skill", "University", "Certification", "Project", "Location"]
-        for label in common_labels:
-            if label in available_labels:
-                validation_queries.append((f"{label} count", f"MATCH (n:{label}) RETURN count(n) as count"))
+        stats = self.get_graph_stats()
+        available_labels = sorted(label for label in stats["labels"] if label not in HIDDEN_LABELS)
+        available_rels = sorted(stats["rel_types"])
 
         print("\n📊 Graph Validation")
         print("-" * 30)
 
-        total_nodes = 0
-        person_count = 0
-
-        for description, query in validation_queries:
-            try:
-                result = self.graph.query(query)
-                count = result[0]["count"] if result else 0
-                print(f"{description}: {count:,}")
+        total_nodes = stats["node_count"]
+        person_count = stats["labels"].get("Person", 0)
 
-                if description == "Total nodes":
-                    total_nodes = count
-                elif description == "Person count":
-                    person_count = count
+        print(f"Total nodes: {total_nodes:,}")
+        print(f"Total relationships: {stats['rel_count']:,}")
 
-            except Exception as e:
-                print(f"{description}: Error - {e}")
+        common_labels = ["Person", "Company", "Skill", "University", "Certification", "Project", "Location"]
+        for label in common_labels:
+            if label in available_labels:
+                print(f"{label} count: {stats['labels'][label]:,}")
 
-        # Show relationship breakdown based on available relationships
+        # Show relationship breakdown for the CV relationship types that exist
         print("\n🔗 Key Relationships:")
 
-        # Get all relationship types
-        try:
-            rel_result = self.graph.query(
-                "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType ORDER BY relationshipType"
-            )
-            available_rels = [row["relationshipType"] for row in rel_result]
-        except:
-            available_rels = []
-
-        # Build relationship queries for common patterns
-        common_rel_patterns = [
-            ("Person-Skill connections", "MATCH (p:Person)-[r]->(s:Skill) RETURN count(*) as count"),
-            ("Person-Company connections", "MATCH (p:Person)-[r]->(c:Company) RETURN count(*) as count"),
-            ("Person-University connections", "MATCH (p:Person)-[r]->(u:University) RETURN count(*) as count"),
-            ("Person-Location connections", "MATCH (p:Person)-[r]->(l:Location) RETURN count(*) as count"),
-            ("Person-Certification connections", "MATCH (p:Person)-[r]->(cert:Certification) RETURN count(*) as count")
+        key_relationships = [
+            ("Person-Skill connections", "HAS_SKILL"),
+            ("Person-Company connections", "WORKED_AT"),
+            ("Person-University connections", "STUDIED_AT"),
+            ("Person-Location connections", "LOCATED_IN"),
+            ("Person-Certification connections", "EARNED")
         ]
 
-        for description, query in common_rel_patterns:
-            try:
-                result = self.graph.query(query)
-                count = result[0]["count"] if result else 0
-                if count > 0:  # Only show relationships that exist
-                    print(f"{description}: {count:,}")
-            except Exception as e:
-                # Silently skip if node types don't exist
-                pass
+        for description, rel_type in key_relationships:
+            count = stats["rel_types"].get(rel_type, 0)
+            if count > 0:  # Only show relationships that exist
+                print(f"{description}: {count:,}")
 
         # Show available labels and relationships
         if available_labels:
@@ -417,116 +1040,35 @@ Helpful Answer:"""
         print("-" * 30)
 
         try:
-            # Get all node labels using CALL db.labels()
-            try:
-                labels_result = self.graph.query("CALL db.labels() YIELD label RETURN label ORDER BY label")
-                node_labels = [row["label"] for row in labels_result if row["label"] != "__Entity__"]
-            except:
-                # Fallback method
-                labels_result = self.graph.query(
-                    "MATCH (n) RETURN DISTINCT labels(n) as labels ORDER BY labels[0]"
-                )
-                node_labels = []
-                for label_row in labels_result:
-                    labels = label_row["labels"]
-                    if labels:
-                        main_labels = [l for l in labels if l != "__Entity__"]
-                        node_labels.extend(main_labels)
-                node_labels = sorted(list(set(node_labels)))
+            stats = self.get_graph_stats()
 
             print("🏷️  Node Types:")
+            node_labels = sorted(label for label in stats["labels"] if label not in HIDDEN_LABELS)
             if node_labels:
                 for label in node_labels:
-                    # Get count for each label
-                    try:
-                        count_result = self.graph.query(f"MATCH (n:{label}) RETURN count(n) as count")
-                        count = count_result[0]["count"] if count_result else 0
-                        print(f"   • {label} ({count:,} nodes)")
-                    except:
-                        print(f"   • {label}")
+                    print(f"   • {label} ({stats['labels'][label]:,} nodes)")
             else:
                 print("   No node types found")
 
-            # Get relationship types
-            try:
-                rel_result = self.graph.query("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType ORDER BY relationshipType")
-                rel_types = [row["relationshipType"] for row in rel_result]
-            except:
-                # Fallback method
-                rel_result = self.graph.query(
-                    "MATCH ()-[r]->() RETURN DISTINCT type(r) as rel_type ORDER BY rel_type"
-                )
-                rel_types = [row["rel_type"] for row in rel_result]
-
             print("\n🔗 Relationship Types:")
-            if rel_types:
-                for rel_type in rel_types:
-                    # Get count for each relationship type
-                    try:
-                        count_result = self.graph.query(f"MATCH ()-[r:{rel_type}]->() RETURN count(r) as count")
-                        count = count_result[0]["count"] if count_result else 0
-                        print(f"   • {rel_type} ({count:,} relationships)")
-                    except:
-                        print(f"   • {rel_type}")
+            if stats["rel_types"]:
+                for rel_type in sorted(stats["rel_types"]):
+                    print(f"   • {rel_type} ({stats['rel_types'][rel_type]:,} relationships)")
             else:
                 print("   No relationships found")
 
             # Show sample data
             print("\n📊 Sample Data:")
 
-            # Sample people (try different property names)
-            people_queries = [
-                ("MATCH (p:Person) RETURN p.id as name LIMIT 3", "id"),
-                ("MATCH (p:Person) RETURN p.name as name LIMIT 3", "name"),
-                ("MATCH (p:Person) RETURN keys(p)[0] as prop, p[keys(p)[0]] as name LIMIT 3", "first_property")
-            ]
-
-            people_found = False
-            for query, prop_type in people_queries:
-                try:
-                    people_sample = self.graph.query(query)
-                    if people_sample and people_sample[0].get("name"):
-                        print(f"   People (via {prop_type}):")
-                        for person in people_sample[:3]:
-                            if person.get("name"):
-                                print(f"     - {person['name']}")
-                        people_found = True
-                        break
-                except:
-                    continue
-
-            if not people_found:
-                try:
-                    # Show first 3 Person nodes with any available properties
-                    people_sample = self.graph.query("MATCH (p:Person) RETURN p LIMIT 3")
-                    if people_sample:
-                        print("   People (raw properties):")
-                        for person in people_sample:
-                            node_props = person.get("p", {})
-                            if isinstance(node_props, dict) and node_props:
-                                # Show first property value
-                                first_key = list(node_props.keys())[0]
-                                print(f"     - {node_props[first_key]} ({first_key})")
-                except:
-                    pass
-
-            # Sample skills
-            skills_queries = [
-                ("MATCH (s:Skill) RETURN s.id as skill LIMIT 5", "id"),
-                ("MATCH (s:Skill) RETURN s.name as skill LIMIT 5", "name")
-            ]
+            if stats["sample_people"]:
+                print("   People (via id):")
+                for person in stats["sample_people"]:
+                    print(f"     - {person}")
 
-            for query, prop_type in skills_queries:
-                try:
-                    skills_sample = self.graph.query(query)
-                    if skills_sample and skills_sample[0].get("skill"):
-                        print(f"   Skills (via {prop_type}):")
-                        for skill in skills_sample[:5]:
-                            if skill.get("skill"):
-                                print(f"     - {skill['skill']}")
-                        break
-                except:
-                    continue
+            if stats["sample_skills"]:
+                print("   Skills (via id):")
+                for skill in stats["sample_skills"]:
+                    print(f"     - {skill}")
 
         except Exception as e:
             print(f"Error displaying schema: {e}")
@@ -562,12 +1104,104 @@ Helpful Answer:"""
                 print(f"❌ Error: {e}")
 
 
+    def semantic_search_mode(self) -> None:
+        """Find candidates by free-text description, optionally filtered by graph facts."""
+        if self.embeddings is None:
+            print("❌ Semantic search requires [vector_index] to be enabled in config.toml")
+            return
+
+        print("\n🧭 Semantic Candidate Search (vector + graph filters)")
+        print("Describe the profile you need; leave filters empty to skip them")
+        print("-" * 40)
+
+        try:
+            text = input("\n📝 Description: ").strip()
+            if not text:
+                return
+            skills = [skill.strip() for skill in input("🛠️  Required skills (comma-separated): ").split(",")]
+            location = input("📍 Location: ").strip() or None
+            company = input("🏢 Company: ").strip() or None
+            certification = input("📜 Certification: ").strip() or None
+            full_text = input("📄 Search full CV texts instead of summaries? (y/N): ").strip().lower() == "y"
+        except KeyboardInterrupt:
+            print()
+            return
+
+        try:
+            rows = self.hybrid_query(
+                text, target="document" if full_text else "person", skills=[skill for skill in skills if skill],
+                company=company, location=location, certification=certification
+            )
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return
+
+        if not rows:
+            print("No matching candidates found.")
+            return
+
+        print(f"\n🎯 Top {len(rows)} candidates:")
+        for i, row in enumerate(rows, 1):
+            print(f"{i:>2}. {row['name']} (score {row['score']:.3f})")
+            if row.get("evidence"):
+                evidence = str(row["evidence"])
+                print(f"    {evidence[:200] + '...' if len(evidence) > 200 else evidence}")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="CV Knowledge Graph - GraphRAG Query System",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python 3_query_knowledge_graph.py                                  # Interactive menu
+  python 3_query_knowledge_graph.py --questions questions.txt         # Batch mode, JSONL to stdout
+  cat questions.txt | python 3_query_knowledge_graph.py --questions - --output results.jsonl
+        """
+    )
+
+    parser.add_argument('--questions', metavar='FILE',
+                        help="Answer questions from FILE (one per line, '-' for stdin) and exit")
+    parser.add_argument('--output', metavar='FILE',
+                        help='Write JSONL results to FILE instead of stdout')
+    parser.add_argument('--concurrency', type=int,
+                        help='Maximum questions in flight (default: graph_rag.max_concurrency)')
+
+    return parser.parse_args()
+
+
+def run_batch(args) -> None:
+    """Non-interactive batch mode: questions in, JSONL results out."""
+    system = CVGraphRAGSystem()
+
+    input_file = sys.stdin if args.questions == "-" else open(args.questions, encoding="utf-8")
+    output_file = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        failed = system.run_question_batch(input_file, output_file, args.concurrency)
+    finally:
+        system.close()
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    if failed:
+        sys.exit(1)
+
+
 def main():
     """Main function to demonstrate GraphRAG capabilities on CV-only knowledge graph."""
+    args = parse_arguments()
+    if args.questions:
+        run_batch(args)
+        return
+
     print("CV Knowledge Graph - GraphRAG Query System")
     print("Natural Language Queries for CV Data")
     print("=" * 50)
 
+    system = None
     try:
         # Initialize system
         system = CVGraphRAGSystem()
@@ -591,9 +1225,10 @@ def main():
             print("7. Certification Analysis queries")
             print("8. Run ALL example queries")
             print("9. Interactive query mode")
+            print("10. Semantic candidate search (vector + graph filters)")
             print("0. Exit")
 
-            choice = input("\nSelect option (0-9): ").strip()
+            choice = input("\nSelect option (0-10): ").strip()
 
             if choice == "1":
                 system.run_example_queries("Basic Information")
@@ -610,18 +1245,24 @@ def main():
             elif choice == "7":
                 system.run_example_queries("Certification Analysis")
             elif choice == "8":
-                system.run_example_queries()
+                system.run_example_queries_concurrently()
             elif choice == "9":
                 system.interactive_mode()
+            elif choice == "10":
+                system.semantic_search_mode()
             elif choice == "0":
                 print("👋 Goodbye!")
                 break
             else:
-                print("❌ Invalid option. Please select 0-9.")
+                print("❌ Invalid option. Please select 0-10.")
 
     except Exception as e:
         logger.error(f"System error: {e}")
         print(f"❌ Error: {e}")
+    finally:
+        # Close the async driver and the session loop once, at exit
+        if system:
+            system.close()
 
 
 if __name__ == "__main__":
@@ -14,8 +14,11 @@ load_dotenv(override=True)
 import os
 import json
 import time
+import asyncio
+import hashlib
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import toml
 
@@ -24,13 +27,20 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnableParallel, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 
+from utils.chunk_metadata import ChunkMetadataExtractor, CHUNK_METADATA_VERSION
+from utils.embedding_cache import CachedEmbeddings, EmbeddingCache, QueryCachedEmbeddings, text_hash
+from utils.embedding_pipeline import aembed_in_batches
+from utils.numpy_vector_store import NumpyVectorStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 class NaiveRAGSystem:
     """Traditional RAG system using vector similarity search."""
 
@@ -41,12 +51,35 @@ class NaiveRAGSystem:
         # Konfiguracja Azure Embeddings
         # UWAGA: Upewnij się, że w Azure masz wdrożenie o nazwie "text-embedding-3-small"
         self.embeddings = AzureOpenAIEmbeddings(
-            azure_deployment="text-embedding-3-small", 
+            azure_deployment=EMBEDDING_MODEL,
             openai_api_version="2023-05-15",
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         )
 
+        # Chunks whose text was embedded before (by any build) are served from disk
+        cache_config = self.config.get('embedding_cache', {})
+        if cache_config.get('enabled', True):
+            self.embedding_cache = EmbeddingCache(cache_config.get('path', '.cache/embeddings.sqlite'))
+            self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache, EMBEDDING_MODEL)
+        else:
+            self.embedding_cache = None
+
+        # Repeated questions reuse their query embedding instead of calling the API
+        query_cache_config = self.config.get('query_embedding_cache', {})
+        if query_cache_config.get('enabled', True):
+            persistent_cache = None
+            if query_cache_config.get('persist', True):
+                persistent_cache = self.embedding_cache or EmbeddingCache(
+                    self.config.get('embedding_cache', {}).get('path', '.cache/embeddings.sqlite')
+                )
+            self.embeddings = QueryCachedEmbeddings(
+                self.embeddings,
+                EMBEDDING_MODEL,
+                max_entries=query_cache_config.get('max_entries', 1024),
+                persistent_cache=persistent_cache
+            )
+
         # Konfiguracja Azure Chat Model
         self.llm = AzureChatOpenAI(
             azure_deployment=os.getenv("AZURE_DEPLOYMENT_NAME"),
@@ -65,10 +98,21 @@ class NaiveRAGSystem:
 
         # Directories
         self.data_dir = Path(self.config['output']['programmers_dir'])
-        self.vector_db_dir = Path("./chroma_naive_rag_cv")
+        # "chroma" (default) or "numpy" (memory-mapped exact search)
+        self.backend = self.config.get('naive_rag', {}).get('backend', 'chroma')
+        self.vector_db_dir = Path(
+            "./numpy_naive_rag_cv" if self.backend == "numpy" else "./chroma_naive_rag_cv"
+        )
         self.results_dir = Path("results")
         self.results_dir.mkdir(exist_ok=True)
 
+        # Lexical skill/company/location metadata for prefiltered retrieval
+        self.metadata_extractor = None
+        if self.config.get('naive_rag', {}).get('metadata_prefilter', True):
+            self.metadata_extractor = ChunkMetadataExtractor.from_profiles(
+                str(self.data_dir / "programmer_profiles.json")
+            )
+
         # Will be initialized when needed
         self.vectorstore = None
         self.retriever = None
@@ -86,9 +130,14 @@ class NaiveRAGSystem:
 
         return config
 
-    def load_cv_documents(self) -> List[Dict[str, Any]]:
-        """Load and process all CV PDF documents."""
-        cv_files = list(self.data_dir.glob("*.pdf"))
+    def _file_hash(self, path: Path) -> str:
+        """Content hash of a CV file, used to detect changed CVs."""
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def load_cv_documents(self, cv_files: List[Path] = None) -> List[Dict[str, Any]]:
+        """Load and process CV PDF documents (all CVs in the data directory by default)."""
+        if cv_files is None:
+            cv_files = list(self.data_dir.glob("*.pdf"))
 
         if not cv_files:
             raise FileNotFoundError(f"No PDF files found in {self.data_dir}")
@@ -102,11 +151,13 @@ class NaiveRAGSystem:
                 docs = loader.load()
 
                 # Add metadata
+                file_hash = self._file_hash(cv_file)
                 for doc in docs:
                     doc.metadata.update({
                         "source_file": cv_file.name,
                         "document_type": "cv",
-                        "person_name": cv_file.stem
+                        "person_name": cv_file.stem,
+                        "file_hash": file_hash
                     })
 
                 documents.extend(docs)
@@ -118,15 +169,23 @@ class NaiveRAGSystem:
         logger.info(f"✓ Loaded {len(documents)} document pages from {len(cv_files)} CVs")
         return documents
 
-    def create_vector_store(self, force_recreate: bool = False) -> None:
-        """Create or load the vector store."""
+    def create_vector_store(self, force_recreate: bool = False, sync: bool = None) -> None:
+        """Create or load the vector store.
+
+        Args:
+            force_recreate: Rebuild the collection from scratch
+            sync: Bring an existing store up to date with the CV directory
+                (defaults to naive_rag.sync_on_load in config.toml)
+        """
+        if sync is None:
+            sync = self.config.get('naive_rag', {}).get('sync_on_load', True)
+
         if self.vector_db_dir.exists() and not force_recreate:
             logger.info("Loading existing vector store...")
-            self.vectorstore = Chroma(
-                persist_directory=str(self.vector_db_dir),
-                embedding_function=self.embeddings
-            )
+            self.vectorstore = self._open_vector_store()
             logger.info("✓ Vector store loaded")
+            if sync:
+                self.sync_vector_store()
         else:
             logger.info("Creating new vector store...")
 
@@ -140,23 +199,164 @@ class NaiveRAGSystem:
 
             # Create vector store
             logger.info("Creating embeddings and vector store...")
-            self.vectorstore = Chroma.from_documents(
-                documents=texts,
-                embedding=self.embeddings,
-                persist_directory=str(self.vector_db_dir)
+            self.vectorstore = self._open_vector_store()
+            if force_recreate:
+                self.vectorstore.reset_collection()
+
+            ids, chunk_texts, metadatas = self._prepare_chunks(texts)
+            report = self._upsert_chunks(ids, chunk_texts, metadatas)
+            logger.info(
+                f"✓ Vector store created and saved ({report['chunks']} chunks in {report['seconds']}s, "
+                f"{report['chunks_per_second']} chunks/s, {report['retries']} rate-limit retries)"
             )
-            logger.info("✓ Vector store created and saved")
+
+    def _open_vector_store(self):
+        """Open the configured vector store backend."""
+        if self.backend == "numpy":
+            return NumpyVectorStore(
+                persist_directory=str(self.vector_db_dir),
+                embedding_function=self.embeddings
+            )
+        return Chroma(
+            persist_directory=str(self.vector_db_dir),
+            embedding_function=self.embeddings
+        )
+
+    def _collection(self):
+        """Collection API (get/upsert/delete/count) of the active backend."""
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            return self.vectorstore
+        return self.vectorstore._collection
+
+    def sync_vector_store(self) -> Dict[str, int]:
+        """Incrementally synchronize the collection with the CV directory.
+
+        Chunk metadata records each chunk's source_file and the content hash of
+        that file, so new CVs are added, changed CVs have their chunks replaced
+        and chunks of removed CVs are deleted, without touching the rest.
+
+        Returns:
+            Dict with the number of added, changed, removed and unchanged files
+        """
+        collection = self._collection()
+
+        indexed: Dict[str, Dict[str, Any]] = {}
+        stored = collection.get(include=["metadatas"])
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+            entry = indexed.setdefault(metadata.get("source_file", "unknown"),
+                                       {"ids": [], "hashes": set(), "versions": set()})
+            entry["ids"].append(chunk_id)
+            entry["hashes"].add(metadata.get("file_hash"))
+            entry["versions"].add(metadata.get("metadata_version"))
+
+        current = {path.name: path for path in self.data_dir.glob("*.pdf")}
+        current_hashes = {name: self._file_hash(path) for name, path in current.items()}
+
+        added = [name for name in current if name not in indexed]
+        changed = [
+            name for name in current
+            if name in indexed and (
+                indexed[name]["hashes"] != {current_hashes[name]}
+                # Chunks indexed before the current lexical metadata are re-extracted
+                or (self.metadata_extractor and indexed[name]["versions"] != {CHUNK_METADATA_VERSION})
+            )
+        ]
+        removed = [name for name in indexed if name not in current]
+
+        stale_ids = [chunk_id for name in changed + removed for chunk_id in indexed[name]["ids"]]
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+
+        to_index = sorted(added + changed)
+        if to_index:
+            documents = self.load_cv_documents([current[name] for name in to_index])
+            chunks = self.text_splitter.split_documents(documents)
+            ids, texts, metadatas = self._prepare_chunks(chunks)
+            report = self._upsert_chunks(ids, texts, metadatas)
+            logger.info(f"✓ Indexed {report['chunks']} chunks ({report['chunks_per_second']} chunks/s)")
+
+        summary = {
+            "added": len(added),
+            "changed": len(changed),
+            "removed": len(removed),
+            "unchanged": len(current) - len(added) - len(changed)
+        }
+        logger.info(
+            f"✓ Vector store synchronized: {summary['added']} added, {summary['changed']} changed, "
+            f"{summary['removed']} removed, {summary['unchanged']} unchanged"
+        )
+        return summary
+
+    def _prepare_chunks(self, chunks: List) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Assign stable ids (source file + position), content hashes and lexical metadata to chunks.
+
+        Skill, company and location fields are extracted per CV and stored on
+        every chunk of that CV, so a prefilter on them keeps whole CVs.
+
+        Returns:
+            Tuple of (ids, texts, metadatas)
+        """
+        cv_metadata: Dict[str, Dict[str, Any]] = {}
+        if self.metadata_extractor:
+            cv_texts: Dict[str, List[str]] = {}
+            for chunk in chunks:
+                cv_texts.setdefault(chunk.metadata.get("source_file", "unknown"), []).append(chunk.page_content)
+            cv_metadata = {name: self.metadata_extractor.extract(texts) for name, texts in cv_texts.items()}
+
+        ids, texts, metadatas = [], [], []
+        positions: Dict[str, int] = {}
+        for chunk in chunks:
+            source_file = chunk.metadata.get("source_file", "unknown")
+            position = positions.get(source_file, 0)
+            positions[source_file] = position + 1
+
+            ids.append(f"{source_file}::{position:04d}")
+            texts.append(chunk.page_content)
+            metadatas.append({
+                **chunk.metadata,
+                **cv_metadata.get(source_file, {}),
+                "chunk_index": position,
+                "content_hash": text_hash(chunk.page_content)
+            })
+        return ids, texts, metadatas
+
+    def _upsert_chunks(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Embed chunks concurrently in batches and bulk-upsert them into the collection.
+
+        Returns:
+            Dict: Embedding report (chunks, batches, retries, seconds, chunks_per_second)
+        """
+        embedding_config = self.config.get('naive_rag', {})
+        vectors, report = asyncio.run(aembed_in_batches(
+            self.embeddings,
+            texts,
+            batch_size=embedding_config.get('embedding_batch_size', 64),
+            concurrency=embedding_config.get('embedding_concurrency', 4),
+            max_retries=embedding_config.get('embedding_max_retries', 6)
+        ))
+
+        upsert_batch_size = embedding_config.get('upsert_batch_size', 1000)
+        collection = self._collection()
+        for start in range(0, len(ids), upsert_batch_size):
+            end = start + upsert_batch_size
+            collection.upsert(
+                ids=ids[start:end],
+                embeddings=vectors[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end]
+            )
+        return report
 
     def setup_rag_chain(self) -> None:
         """Setup the RAG chain for question answering."""
         if self.vectorstore is None:
             raise ValueError("Vector store not initialized. Call create_vector_store() first.")
 
-        # Create retriever
-        self.retriever = self.vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 5}  # Retrieve top 5 similar chunks
-        )
+        # Create retriever (top 5 similar chunks, narrowed by the metadata prefilter)
+        if self.metadata_extractor:
+            stored = self._collection().get(include=["metadatas"])
+            self.metadata_extractor.learn_companies(stored["metadatas"])
+        self.retriever = RunnableLambda(lambda inputs: self._retrieve(inputs["question"], inputs["where"]))
 
         # Create prompt template
         prompt = ChatPromptTemplate.from_messages([
@@ -180,15 +380,48 @@ Context from CVs:
         def format_docs(docs):
             return "\n\n".join(doc.page_content for doc in docs)
 
-        self.rag_chain = (
-            {"context": self.retriever | format_docs, "question": RunnablePassthrough()}
+        answer_chain = (
+            RunnablePassthrough.assign(context=lambda inputs: format_docs(inputs["docs"]))
             | prompt
             | self.llm
             | StrOutputParser()
         )
 
+        # Retrieve once; the output carries both the documents and the answer.
+        # Input: {"question": ..., "where": metadata filter or None}
+        self.rag_chain = RunnableParallel(
+            docs=self.retriever,
+            question=itemgetter("question")
+        ).assign(answer=answer_chain)
+
         logger.info("✓ RAG chain configured")
 
+    def metadata_filter(self, question: str) -> Optional[Dict[str, Any]]:
+        """Metadata filter for the skills, companies and locations a question names."""
+        if self.metadata_extractor is None:
+            return None
+        return self.metadata_extractor.query_filter(question)
+
+    def _retrieve(self, question: str, where: Optional[Dict[str, Any]] = None, k: int = 5) -> List:
+        """Vector search, restricted to matching CVs when a metadata filter is given.
+
+        Falls back to searching the whole collection when the prefilter leaves
+        fewer than naive_rag.prefilter_min_results chunks.
+
+        Args:
+            question: User question
+            where: Metadata filter from metadata_filter(question), or None
+            k: Number of chunks to return
+        """
+        if where:
+            docs = self.vectorstore.similarity_search(question, k=k, filter=where)
+            min_results = self.config.get('naive_rag', {}).get('prefilter_min_results', 1)
+            if len(docs) >= min_results:
+                logger.info(f"Prefilter {where} kept {len(docs)} chunks")
+                return docs
+            logger.info(f"Prefilter {where} matched {len(docs)} chunks, searching all chunks")
+        return self.vectorstore.similarity_search(question, k=k)
+
     def query(self, question: str) -> Dict[str, Any]:
         """Process a query through the Naive RAG system."""
         start_time = time.time()
@@ -199,11 +432,11 @@ Context from CVs:
 
             logger.info(f"Processing query: {question}")
 
-            # Get relevant documents for debugging
-            relevant_docs = self.retriever.invoke(question)
-
-            # Generate answer
-            answer = self.rag_chain.invoke(question)
+            # Single retrieval: the chain returns the documents used and the answer
+            where = self.metadata_filter(question)
+            output = self.rag_chain.invoke({"question": question, "where": where})
+            relevant_docs = output["docs"]
+            answer = output["answer"]
 
             execution_time = time.time() - start_time
 
@@ -223,6 +456,7 @@ Context from CVs:
                 "source_type": "naive_rag",
                 "execution_time": execution_time,
                 "num_chunks_retrieved": len(relevant_docs),
+                "metadata_filter": where,
                 "context_info": context_info,
                 "success": True
             }
@@ -245,11 +479,11 @@ Context from CVs:
                 "error": str(e)
             }
 
-    def initialize_system(self, force_recreate_vectorstore: bool = False) -> bool:
+    def initialize_system(self, force_recreate_vectorstore: bool = False, sync_vectorstore: bool = None) -> bool:
         """Initialize the complete RAG system."""
         try:
             # Create/load vector store
-            self.create_vector_store(force_recreate=force_recreate_vectorstore)
+            self.create_vector_store(force_recreate=force_recreate_vectorstore, sync=sync_vectorstore)
 
             # Setup RAG chain
             self.setup_rag_chain()
@@ -279,6 +513,12 @@ Context from CVs:
             logger.error(f"System validation error: {e}")
             return False
 
+    def query_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit-rate metrics of the query-embedding cache (None if disabled)."""
+        if isinstance(self.embeddings, QueryCachedEmbeddings):
+            return self.embeddings.stats()
+        return None
+
     def get_database_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector database."""
         if self.vectorstore is None:
@@ -286,7 +526,7 @@ Context from CVs:
 
         try:
             # Get collection info
-            collection = self.vectorstore._collection
+            collection = self._collection()
             total_chunks = collection.count()
 
             # Get sample of source files
@@ -297,8 +537,9 @@ Context from CVs:
 
             stats = {
                 "total_chunks": total_chunks,
+                "query_embedding_cache": self.query_cache_stats(),
                 "sample_source_files": list(source_files)[:10],
-                "embedding_model": "text-embedding-3-small",
+                "embedding_model": EMBEDDING_MODEL,
                 "chunk_size": 1000,
                 "chunk_overlap": 200
             }
@@ -358,6 +599,11 @@ def test_naive_rag_system():
         else:
             print(f"❌ Error: {result['answer']}")
 
+    cache_stats = rag_system.query_cache_stats()
+    if cache_stats:
+        print(f"\nQuery embedding cache: {cache_stats['hit_rate']:.0%} hit rate "
+              f"({cache_stats['memory_hits'] + cache_stats['disk_hits']}/{cache_stats['lookups']} lookups)")
+
     # Save test results
     output_file = Path("results") / "naive_rag_test_results.json"
     with open(output_file, 'w') as f:
@@ -4,6 +4,7 @@ from pyvis.network import Network
 import streamlit.components.v1 as components
 import os
 import tempfile
+import logging
 
 # Importujemy Twój istniejący system
 # Upewnij się, że plik 3_query_knowledge_graph.py jest w tym samym folderze
@@ -11,6 +12,8 @@ from importlib.machinery import SourceFileLoader
 graph_rag_module = SourceFileLoader("graph_rag", "3_query_knowledge_graph.py").load_module()
 CVGraphRAGSystem = graph_rag_module.CVGraphRAGSystem
 
+logger = logging.getLogger(__name__)
+
 # --- KONFIGURACJA STRONY ---
 st.set_page_config(
     page_title="TalentMatch AI - GraphRAG",
@@ -91,12 +94,11 @@ with st.sidebar:
     if system:
         st.success("✅ Neo4j Połączone")
         
-        # Statystyki
+        # Statystyki (jedno zapytanie, wynik cache'owany w systemie)
         try:
-            stats = system.graph.query("MATCH (n) RETURN count(n) as count")
-            st.metric("Liczba węzłów", stats[0]['count'])
-            stats_rel = system.graph.query("MATCH ()-[r]->() RETURN count(r) as count")
-            st.metric("Liczba relacji", stats_rel[0]['count'])
+            stats = system.get_graph_stats()
+            st.metric("Liczba węzłów", stats['node_count'])
+            st.metric("Liczba relacji", stats['rel_count'])
         except:
             pass
     else:
@@ -139,18 +141,22 @@ with tab1:
                 st.code(response['cypher_query'], language="cypher")
                 st.caption("To zapytanie zostało wygenerowane przez LLM i wykonane na Neo4j.")
 
+            # Zapytanie trafiło na LIMIT dopisany przez strażnika - wyniki są niepełne
+            if response.get('results_truncated'):
+                st.info(f"ℹ️ Wyniki ograniczono do {response['limit_applied']} wierszy (dodano LIMIT).")
+
             # Próba wizualizacji wyników w tabeli (jeśli zapytanie zwraca listę)
             # To jest "bajer" - próbujemy zgadnąć czy wynik to lista ludzi
             if "RETURN" in response['cypher_query'].upper():
                 try:
-                    # Uruchamiamy to samo zapytanie Cypher, żeby dostać surowe dane do tabelki
-                    raw_data = system.graph.query(response['cypher_query'])
+                    # Uruchamiamy to samo zapytanie Cypher (z parametrami $param), żeby dostać surowe dane do tabelki
+                    raw_data = system.graph.query(response['cypher_query'], response.get('cypher_params') or {})
                     if raw_data:
                         st.markdown("#### 📊 Znalezione dane:")
                         df = pd.DataFrame(raw_data)
                         st.dataframe(df, use_container_width=True)
-                except:
-                    pass
+                except Exception as e:
+                    logger.warning(f"Could not load result table for {response['cypher_query']!r}: {e}")
 
 with tab2:
     st.subheader("Interaktywna Wizualizacja Grafu")
@@ -0,0 +1,56 @@
+"""Values compared against the normalized `key` property are folded like the keys."""
+
+import pytest
+
+from utils.cypher_params import normalize_key_params, prepare_generated_cypher
+from utils.entity_search import normalize_key_literals
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (c:Certification) WHERE c.key = $provider RETURN c.id",
+    "MATCH (c:Certification) WHERE c.key IN $provider RETURN c.id",
+    "MATCH (c:Certification {key: $provider}) RETURN c.id",
+    "MATCH (c:Certification) WHERE c.key CONTAINS $provider RETURN c.id",
+    "MATCH (c:Certification) WHERE c.key STARTS WITH $provider RETURN c.id",
+    "MATCH (c:Certification) WHERE c.key starts  with $provider RETURN c.id",
+])
+def test_key_params_are_normalized(cypher):
+    params = normalize_key_params(cypher, {"provider": "AWS Certified"})
+    assert params == {"provider": "awscertified"}
+
+
+def test_key_list_params_are_normalized():
+    params = normalize_key_params("MATCH (s:Skill) WHERE s.key IN $skills RETURN s.id",
+                                  {"skills": ["Node.js", "C++"]})
+    assert params == {"skills": ["nodejs", "c++"]}
+
+
+def test_other_params_are_left_alone():
+    params = normalize_key_params("MATCH (p:Person) WHERE p.id CONTAINS $name RETURN p.id",
+                                  {"name": "Anna Smith"})
+    assert params == {"name": "Anna Smith"}
+
+
+@pytest.mark.parametrize("cypher, expected", [
+    ('MATCH (s:Skill) WHERE s.key = "Node.js" RETURN s', 'MATCH (s:Skill) WHERE s.key = "nodejs" RETURN s'),
+    ("MATCH (s:Skill {key: 'Node.js'}) RETURN s", "MATCH (s:Skill {key: 'nodejs'}) RETURN s"),
+    ('MATCH (s:Skill) WHERE s.key IN ["Node.js", "Vue.js"] RETURN s',
+     'MATCH (s:Skill) WHERE s.key IN ["nodejs", "vuejs"] RETURN s'),
+    ('MATCH (c:Certification) WHERE c.key CONTAINS "AWS Certified" RETURN c',
+     'MATCH (c:Certification) WHERE c.key CONTAINS "awscertified" RETURN c'),
+    ('MATCH (c:Certification) WHERE c.key STARTS WITH "AWS Certified" RETURN c',
+     'MATCH (c:Certification) WHERE c.key STARTS WITH "awscertified" RETURN c'),
+])
+def test_key_literals_are_normalized(cypher, expected):
+    assert normalize_key_literals(cypher) == expected
+
+
+def test_generated_contains_query_gets_normalized_param():
+    cypher, params = prepare_generated_cypher(
+        "MATCH (p:Person)-[:EARNED]->(c:Certification)\n"
+        "WHERE c.key CONTAINS $provider\n"
+        "RETURN p.id AS name\n"
+        '// params: {"provider": "AWS Certified"}'
+    )
+    assert "$provider" in cypher
+    assert params == {"provider": "awscertified"}
@@ -0,0 +1,112 @@
+"""
+GraphRAG Answer Cache
+=====================
+
+SQLite-backed cache of full GraphRAG answers, keyed by the normalized
+question and the graph epoch. Ingestion bumps the epoch on every write
+batch, so answers computed against older data are never served.
+
+A single SQLite file (WAL mode) is shared by the CLI, the comparison
+script and every Streamlit session.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+import logging
+
+from utils.common import normalize_question, sqlite_connect
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """Full-answer cache with TTL and size limits, shareable across processes."""
+
+    def __init__(self, path: str, ttl_seconds: int = 86400, max_entries: int = 5000):
+        """Initialize the cache and create the backing table if needed.
+
+        Args:
+            path: Location of the SQLite file
+            ttl_seconds: Maximum age of a cached answer
+            max_entries: Maximum number of cached answers (least recently used are evicted)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        with sqlite_connect(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    question_key TEXT NOT NULL,
+                    epoch INTEGER NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (question_key, epoch)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed_at ON answers (accessed_at)")
+
+    def get(self, question: str, epoch: int) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a question at the given epoch, if fresh."""
+        key = normalize_question(question)
+        now = time.time()
+
+        with sqlite_connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM answers WHERE question_key = ? AND epoch = ?",
+                (key, epoch)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute(
+                    "DELETE FROM answers WHERE question_key = ? AND epoch = ?",
+                    (key, epoch)
+                )
+                return None
+
+            conn.execute(
+                "UPDATE answers SET accessed_at = ? WHERE question_key = ? AND epoch = ?",
+                (now, key, epoch)
+            )
+
+        return json.loads(response)
+
+    def put(self, question: str, epoch: int, response: Dict[str, Any]) -> None:
+        """Store a response and enforce epoch, TTL and size limits."""
+        key = normalize_question(question)
+        now = time.time()
+
+        with sqlite_connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                (key, epoch, json.dumps(response, default=str), now, now)
+            )
+
+            # Answers from older epochs can never be served again
+            conn.execute("DELETE FROM answers WHERE epoch < ?", (epoch,))
+            conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+
+            # Evict least recently used entries above the size limit
+            conn.execute(
+                """
+                DELETE FROM answers WHERE rowid IN (
+                    SELECT rowid FROM answers ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        with sqlite_connect(self.path) as conn:
+            conn.execute("DELETE FROM answers")
+        logger.info("✓ Answer cache cleared")
@@ -0,0 +1,98 @@
+"""
+Deterministic Answer Rendering
+==============================
+
+Formats simple Cypher results (scalars, counts, single-column lists and
+label/count pairs) into answers directly, so the QA LLM call is only needed
+for complex multi-column results.
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+from utils.common import is_scalar
+
+# Column names that carry no meaning of their own
+GENERIC_COLUMNS = {"count", "total", "result", "value", "n", "num", "number", "name", "names"}
+
+
+def humanize_column(column: str) -> str:
+    """Turn a Cypher column alias (pythonProgrammers, num_people) into words."""
+    words = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", column).replace("_", " ").replace(".", " ")
+    return " ".join(words.lower().split())
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+def render_answer(rows: List[Dict[str, Any]], limited: bool = False) -> Optional[str]:
+    """Render a Cypher result deterministically when its shape allows it.
+
+    Args:
+        rows: Records returned by the Cypher query
+        limited: Whether the query hit a row cap, so counts are lower bounds
+
+    Returns:
+        str: Rendered answer, or None if the result needs the QA LLM
+    """
+    if not rows:
+        return "No matching records were found in the knowledge graph."
+
+    columns = list(rows[0].keys())
+
+    if len(columns) == 1:
+        column = columns[0]
+        label = humanize_column(column)
+        values = [row.get(column) for row in rows]
+
+        # A single row holding a collected list behaves like a list result
+        if len(values) == 1 and isinstance(values[0], list):
+            values = values[0]
+        if not all(is_scalar(value) for value in values):
+            return None
+
+        # Repeated values are kept: two people may share the same years of experience
+        values = [value for value in values if value is not None]
+        if not values:
+            return "No matching records were found in the knowledge graph."
+
+        # Scalar or count result; a single name is rendered as a one-item list below
+        if len(rows) == 1 and len(values) == 1 and not isinstance(rows[0][column], list) \
+                and not isinstance(values[0], str):
+            if label in GENERIC_COLUMNS:
+                return f"The result is {_format_value(values[0])}."
+            return f"{label.capitalize()}: {_format_value(values[0])}."
+
+        # Single-column list result
+        items = ", ".join(_format_value(value) for value in values)
+        noun = "result" if len(values) == 1 else "results"
+        found = f"at least {len(values)}" if limited else str(len(values))
+        if label in GENERIC_COLUMNS:
+            return f"Found {found} {noun}: {items}."
+        return f"Found {found} {noun} ({label}): {items}."
+
+    if len(columns) == 2:
+        # Label/count pairs such as "most common skills"
+        key_column, count_column = columns
+        if all(
+            is_scalar(row.get(key_column)) and not _is_number(row.get(key_column))
+            and _is_number(row.get(count_column))
+            for row in rows
+        ):
+            items = ", ".join(
+                f"{row[key_column]} ({_format_value(row[count_column])})" for row in rows
+            )
+            shown = f" (first {len(rows)} shown)" if limited else ""
+            return (
+                f"{humanize_column(key_column).capitalize()} by "
+                f"{humanize_column(count_column)}{shown}: {items}."
+            )
+
+    return None
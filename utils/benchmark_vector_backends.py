@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Vector Backend Benchmark: Chroma vs NumPy
+=========================================
+
+Compares the naive RAG vector store backends on the same chunks:
+- load time (opening the store, plus the first query for lazily loaded indexes),
+- query latency (p50/p95/mean over stored-chunk query vectors, no API calls),
+- resident memory after loading and after querying,
+- overlap of the NumPy (exact) top-k with Chroma's (approximate) top-k.
+
+Each backend runs in a fresh subprocess so load time and RSS are not skewed by
+the other. If the NumPy store does not exist yet it is exported from Chroma.
+
+Usage:
+    uv run python -m utils.benchmark_vector_backends [--queries 200] [--k 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+import numpy as np
+
+from utils.numpy_vector_store import NumpyVectorStore, EMBEDDINGS_FILE
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS if psutil is unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def export_chroma_to_numpy(chroma_dir: str, numpy_dir: str) -> int:
+    """Copy ids, documents, metadata and embeddings from Chroma into a NumPy store."""
+    from langchain_chroma import Chroma
+
+    collection = Chroma(persist_directory=chroma_dir)._collection
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+
+    store = NumpyVectorStore(numpy_dir)
+    store.reset_collection()
+    store.upsert(data["ids"], data["embeddings"], data["documents"], data["metadatas"])
+    return store.count()
+
+
+def run_worker(backend: str, store_dir: str, queries_path: str, k: int) -> Dict[str, Any]:
+    """Measure one backend inside the current (fresh) process."""
+    rss_start = rss_mb()
+
+    start = time.perf_counter()
+    if backend == "numpy":
+        store = NumpyVectorStore(store_dir)
+    else:
+        from langchain_chroma import Chroma
+        store = Chroma(persist_directory=store_dir)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    queries = np.load(queries_path)
+
+    start = time.perf_counter()
+    store.similarity_search_by_vector(queries[0].tolist(), k=k)
+    first_query_ms = (time.perf_counter() - start) * 1000
+    rss_loaded = rss_mb()
+
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        docs = store.similarity_search_by_vector(query.tolist(), k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([doc.id for doc in docs])
+
+    latencies.sort()
+    return {
+        "backend": backend,
+        "open_ms": round(open_ms, 2),
+        "first_query_ms": round(first_query_ms, 2),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "rss_start_mb": round(rss_start, 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_after_queries_mb": round(rss_mb(), 1),
+        "results": results,
+    }
+
+
+def benchmark(chroma_dir: str, numpy_dir: str, num_queries: int, k: int) -> Dict[str, Any]:
+    """Run both backends in subprocesses and compare them."""
+    if not (Path(numpy_dir) / EMBEDDINGS_FILE).exists():
+        print(f"📦 Exporting {chroma_dir} to {numpy_dir}...")
+        print(f"✓ Exported {export_chroma_to_numpy(chroma_dir, numpy_dir)} chunks")
+
+    # Query vectors: stored chunk embeddings with a little noise (no embedding API calls)
+    matrix = np.load(Path(numpy_dir) / EMBEDDINGS_FILE)
+    rng = np.random.default_rng(42)
+    queries = matrix[rng.integers(0, len(matrix), num_queries)]
+    queries = queries + rng.normal(0, 0.01, queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queries_path = os.path.join(tmp, "queries.npy")
+        np.save(queries_path, queries)
+
+        reports = {}
+        for backend, store_dir in [("chroma", chroma_dir), ("numpy", numpy_dir)]:
+            output = subprocess.run(
+                [sys.executable, "-m", "utils.benchmark_vector_backends", "--worker", backend,
+                 "--store", store_dir, "--queries-file", queries_path, "--k", str(k)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            reports[backend] = json.loads(output.strip().splitlines()[-1])
+
+    overlaps = [
+        len(set(chroma) & set(exact)) / len(exact)
+        for chroma, exact in zip(reports["chroma"].pop("results"), reports["numpy"].pop("results")) if exact
+    ]
+    return {
+        "chunks": int(len(matrix)),
+        "dimensions": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "queries": num_queries,
+        "k": k,
+        "chroma": reports["chroma"],
+        "numpy": reports["numpy"],
+        "chroma_recall_vs_exact": round(sum(overlaps) / len(overlaps), 4) if overlaps else None,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the comparison table."""
+    print(f"\n⚡ Vector backend benchmark ({report['chunks']} chunks x {report['dimensions']} dims, "
+          f"{report['queries']} queries, k={report['k']})")
+    print("=" * 60)
+    print(f"{'metric':<24}{'chroma':>16}{'numpy':>16}")
+    for metric in ["open_ms", "first_query_ms", "p50_ms", "p95_ms", "mean_ms",
+                   "rss_loaded_mb", "rss_after_queries_mb"]:
+        print(f"{metric:<24}{report['chroma'][metric]:>16}{report['numpy'][metric]:>16}")
+    print(f"\nChroma top-{report['k']} recall vs exact search: {report['chroma_recall_vs_exact']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Chroma against the NumPy vector store")
+    parser.add_argument("--chroma-dir", default="./chroma_naive_rag_cv", help="Chroma persist directory")
+    parser.add_argument("--numpy-dir", default="./numpy_naive_rag_cv", help="NumPy store directory")
+    parser.add_argument("--queries", type=int, default=200, help="Number of timed queries")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--output", default="results/vector_backend_benchmark.json", help="JSON report path")
+    # Internal: measure a single backend in this process
+    parser.add_argument("--worker", choices=["chroma", "numpy"], help=argparse.SUPPRESS)
+    parser.add_argument("--store", help=argparse.SUPPRESS)
+    parser.add_argument("--queries-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.store, args.queries_file, args.k)))
+    else:
+        report = benchmark(args.chroma_dir, args.numpy_dir, args.queries, args.k)
+        print_report(report)
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report saved to: {args.output}")
@@ -0,0 +1,164 @@
+"""
+Lexical Chunk Metadata for Prefiltered Retrieval
+================================================
+
+A fast lexical pass (no LLM, no embeddings) that finds the skills, companies
+and locations a CV mentions and stores them on every chunk of that CV as
+filterable metadata:
+
+- `skill_<key>` / `company_<key>` / `location_<key>` boolean flags, usable
+  in Chroma `where` filters and by the NumPy store,
+- readable `skills` / `companies` / `locations` strings for display.
+
+On the query side the same lexicon turns "Python developers in Berlin" into a
+metadata filter, so vector scoring only runs over the matching CVs' chunks.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+import logging
+
+from utils.entity_search import normalize_key
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the extracted fields change, so sync re-indexes older chunks
+CHUNK_METADATA_VERSION = 2
+
+# Fallback skill lexicon (the catalog used by 1_generate_data.py)
+DEFAULT_SKILLS = [
+    "Python", "Java", "C++", "Go", "Rust", "Node.js", "Django", "Spring Boot",
+    "JavaScript", "TypeScript", "React", "Vue.js", "Angular", "Next.js",
+    "Machine Learning", "Data Science", "PostgreSQL", "MongoDB", "Redis", "PyTorch",
+    "AWS", "Docker", "Kubernetes", "Jenkins", "Git", "Terraform", "Azure",
+]
+
+MAX_NGRAM = 4
+TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.&-]*")
+
+# "Senior Engineer at Acme Analytics", "Acme Labs Inc."
+COMPANY_AFTER_AT = re.compile(r"\b(?:at|@)\s+((?:[A-Z][\w&-]*)(?:\s+[A-Z][\w&-]*){0,3})")
+COMPANY_WITH_SUFFIX = re.compile(
+    r"\b((?:[A-Z][\w&-]*\s+){0,3}[A-Z][\w&-]*\s+"
+    r"(?:Inc|Ltd|LLC|Corp|Corporation|Technologies|Solutions|Systems|Labs|Group|GmbH))\b"
+)
+
+
+def _ngrams(text: str) -> List[str]:
+    tokens = [token.rstrip(".-") for token in TOKEN.findall(text)]
+    return [
+        " ".join(tokens[start:start + size])
+        for size in range(1, MAX_NGRAM + 1)
+        for start in range(len(tokens) - size + 1)
+    ]
+
+
+class ChunkMetadataExtractor:
+    """Lexicon-based extraction of skills, companies and locations."""
+
+    def __init__(self, skills: List[str], locations: List[str], exclude_companies: List[str] = ()):
+        """Build the lexicons.
+
+        Args:
+            skills: Known skill names
+            locations: Known location names
+            exclude_companies: Capitalized names that are not companies (e.g. universities)
+        """
+        self.skills = {normalize_key(name): name for name in skills if name}
+        self.locations = {normalize_key(name): name for name in locations if name}
+        self.exclude_companies = {normalize_key(name) for name in exclude_companies if name}
+        self.companies: Dict[str, str] = {}
+
+    @classmethod
+    def from_profiles(cls, profiles_path: str) -> "ChunkMetadataExtractor":
+        """Build lexicons from programmer_profiles.json (falling back to the skill catalog)."""
+        skills, locations, universities = list(DEFAULT_SKILLS), [], []
+        path = Path(profiles_path)
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for profile in json.load(f):
+                    skills.extend(skill.get("name") for skill in profile.get("skills", []))
+                    locations.append(profile.get("location"))
+                    universities.append(profile.get("education", {}).get("university_name"))
+        else:
+            logger.warning(f"Profiles file not found ({profiles_path}), using the default skill lexicon only")
+        return cls(skills, locations, exclude_companies=universities)
+
+    def _lookup(self, text: str, lexicon: Dict[str, str]) -> Set[str]:
+        found = set()
+        for ngram in _ngrams(text):
+            key = normalize_key(ngram)
+            if key in lexicon:
+                # Very short names ("Go", "R") only count with their exact spelling
+                if len(key) <= 2 and ngram != lexicon[key]:
+                    continue
+                found.add(key)
+        return found
+
+    def _companies(self, text: str) -> Dict[str, str]:
+        companies = {}
+        for pattern in (COMPANY_AFTER_AT, COMPANY_WITH_SUFFIX):
+            for match in pattern.finditer(text):
+                name = match.group(1).strip()
+                key = normalize_key(name)
+                if key and key not in self.exclude_companies and key not in self.locations:
+                    companies[key] = name
+        return companies
+
+    def extract(self, texts: List[str]) -> Dict[str, Any]:
+        """Extract the filterable metadata for one CV from its chunk texts."""
+        text = "\n".join(texts)
+        skills = self._lookup(text, self.skills)
+        locations = self._lookup(text, self.locations)
+        companies = self._companies(text)
+        self.companies.update(companies)
+
+        metadata: Dict[str, Any] = {
+            "metadata_version": CHUNK_METADATA_VERSION,
+            "skills": ", ".join(sorted(self.skills[key] for key in skills)),
+            "companies": ", ".join(sorted(companies.values())),
+            "locations": ", ".join(sorted(self.locations[key] for key in locations)),
+        }
+        # A CV can mention several cities, so locations are flags like skills
+        metadata.update({f"skill_{key}": True for key in skills})
+        metadata.update({f"company_{key}": True for key in companies})
+        metadata.update({f"location_{key}": True for key in locations})
+        return metadata
+
+    def learn_companies(self, metadatas: List[Dict[str, Any]]) -> None:
+        """Add company keys already stored in the collection to the query lexicon."""
+        for metadata in metadatas:
+            for field in metadata:
+                if field.startswith("company_"):
+                    key = field[len("company_"):]
+                    self.companies.setdefault(key, key)
+
+    def query_filter(self, question: str) -> Optional[Dict[str, Any]]:
+        """Build a Chroma-style `where` filter from the entities a question mentions.
+
+        Every mentioned entity must be present in the CV; questions phrased with
+        "or" accept any of the mentioned skills instead.
+
+        Returns:
+            dict filter, or None when the question names no known entity
+        """
+        skills = self._lookup(question, self.skills)
+        companies = self._lookup(question, self.companies)
+        locations = self._lookup(question, self.locations)
+
+        skill_clauses = [{f"skill_{key}": True} for key in sorted(skills)]
+        if len(skill_clauses) > 1 and re.search(r"\b(?:or|either|any of)\b", question, re.IGNORECASE):
+            skill_clauses = [{"$or": skill_clauses}]
+
+        clauses = skill_clauses + [{f"company_{key}": True} for key in sorted(companies)]
+        location_clauses = [{f"location_{key}": True} for key in sorted(locations)]
+        if len(location_clauses) == 1:
+            clauses.extend(location_clauses)
+        elif location_clauses:
+            clauses.append({"$or": location_clauses})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
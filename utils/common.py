@@ -0,0 +1,41 @@
+"""
+Shared Helpers
+==============
+
+Small helpers used by several utils modules (answer and embedding caches,
+intent router, Cypher parameters, query profiler, answer renderer, ...),
+kept in one place so their behaviour cannot drift apart.
+"""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Any
+
+# Quoted Cypher string literal; group 1 is the quote, group 2 the raw content
+STRING_LITERAL = re.compile(r"""(["'])((?:\\.|(?!\1).)*)\1""")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase a question and strip whitespace and trailing punctuation.
+
+    Trivial variations of a question ("Who knows Python?" / "who knows python")
+    normalize to the same string, for cache keys and template matching alike.
+    """
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+def is_scalar(value: Any) -> bool:
+    """Whether a value is a plain scalar (None, string, number or boolean)."""
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+@contextmanager
+def sqlite_connect(path):
+    """Open a short-lived SQLite connection in a transaction (safe to use from any thread)."""
+    conn = sqlite3.connect(str(path), timeout=10)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
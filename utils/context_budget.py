@@ -0,0 +1,116 @@
+"""
+QA Context Budgeting
+====================
+
+Listing questions ("List all the skills") can return hundreds of rows, which
+turns the QA prompt into a slow, oversized completion. The budgeter keeps
+as many rows as fit into a token budget, replaces the rest with a short
+aggregate summary and reports what was dropped. When the result itself was
+capped by a LIMIT, the summary says so: its counts are then lower bounds.
+"""
+
+import json
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Count tokens with tiktoken, falling back to a 4-characters-per-token estimate."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+class ContextBudgeter:
+    """Fits Cypher results into a token budget for the QA prompt."""
+
+    def __init__(self, max_tokens: int = 2000, max_rows: int = 100, max_value_chars: int = 300,
+                 model: str = "gpt-4o-mini"):
+        """Initialize the budgeter.
+
+        Args:
+            max_tokens: Token budget for the serialized rows
+            max_rows: Maximum number of rows passed to the QA prompt
+            max_value_chars: Long string values are shortened to this length
+            model: Model name used to pick the tokenizer
+        """
+        self.max_tokens = max_tokens
+        self.max_rows = max_rows
+        self.max_value_chars = max_value_chars
+        self.model = model
+
+    def _shorten(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value[:self.max_value_chars] + "..."
+            if isinstance(value, str) and len(value) > self.max_value_chars else value
+            for key, value in row.items()
+        }
+
+    def _summarize(self, rows: List[Dict[str, Any]], included: int, limited: bool = False) -> Dict[str, Any]:
+        """Aggregate counts describing the complete result, including dropped rows."""
+        summary = {"total_rows": len(rows), "rows_shown": included}
+        if limited:
+            # The query hit its row cap: the real total is at least total_rows
+            summary["limited"] = True
+        for column in rows[0].keys():
+            values = [row.get(column) for row in rows if row.get(column) is not None]
+            numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            if numbers and len(numbers) == len(values):
+                summary[column] = {"min": min(numbers), "max": max(numbers), "sum": sum(numbers)}
+            elif all(isinstance(v, str) for v in values):
+                summary[column] = {"distinct_values": len(set(values))}
+        return summary
+
+    def fit(self, rows: List[Dict[str, Any]], limited: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Select the rows that fit the budget.
+
+        Args:
+            rows: Records returned by the Cypher query
+            limited: Whether the query hit a row cap (more rows exist than returned)
+
+        Returns:
+            Tuple of (context rows for the QA prompt, report of what was kept and dropped)
+        """
+        context = []
+        tokens = 0
+        for row in rows[:self.max_rows]:
+            row = self._shorten(row)
+            row_tokens = count_tokens(json.dumps(row, default=str), self.model)
+            if context and tokens + row_tokens > self.max_tokens:
+                break
+            context.append(row)
+            tokens += row_tokens
+
+        report = {
+            "rows_total": len(rows),
+            "rows_included": len(context),
+            "rows_dropped": len(rows) - len(context),
+            "context_tokens": tokens,
+            "limited": limited
+        }
+
+        if report["rows_dropped"] or (limited and rows):
+            context.append({"truncated_result_summary": self._summarize(rows, len(context), limited)})
+            logger.info(
+                f"QA context truncated: {report['rows_included']}/{report['rows_total']} rows "
+                f"({tokens} tokens)"
+            )
+
+        return context, report
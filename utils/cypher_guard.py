@@ -0,0 +1,131 @@
+"""
+EXPLAIN-based Cost Guard for Generated Cypher
+=============================================
+
+LLM-generated Cypher can contain cartesian products or unbounded
+variable-length expansions that keep Neo4j busy for minutes. Before a
+generated query runs, the guard asks Neo4j for its plan (EXPLAIN, which
+does not execute anything) and:
+
+- rejects write queries,
+- rejects cartesian products and unbounded expansions whose estimated
+  row count exceeds a configurable threshold,
+- appends a LIMIT to the final RETURN when the query has none, and reports
+  it so callers can tell the user that results may be truncated. One extra
+  row is fetched so callers can tell whether the cap was actually hit.
+"""
+
+import re
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Variable-length patterns without an upper bound: [*], [*2..], [*..]
+UNBOUNDED_EXPANSION = re.compile(r"\*\s*\]|\*\s*\d*\s*\.\.\s*\]")
+
+
+class CypherGuardError(ValueError):
+    """Raised when a generated query is rejected by the cost guard."""
+
+
+def _walk_plan(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("children", []):
+        yield from _walk_plan(child)
+
+
+class CypherGuard:
+    """Validates and rewrites generated Cypher before execution."""
+
+    def __init__(self, max_estimated_rows: int = 100000, default_limit: int = 200, allow_writes: bool = False,
+                 database: str = None):
+        """Initialize the guard.
+
+        Args:
+            max_estimated_rows: Largest estimated row count allowed for risky operators
+            default_limit: LIMIT appended to queries without one
+            allow_writes: Whether write queries may be executed
+            database: Database the queries run against (server default if None)
+        """
+        self.max_estimated_rows = max_estimated_rows
+        self.default_limit = default_limit
+        self.allow_writes = allow_writes
+        self.database = database
+
+    def validate_plan(self, plan: Dict[str, Any], query_type: str) -> None:
+        """Reject plans that write or contain expensive risky operators.
+
+        Args:
+            plan: Plan tree from the EXPLAIN result summary
+            query_type: Query type from the summary ('r', 'rw', 'w' or 's')
+        """
+        if query_type != "r" and not self.allow_writes:
+            raise CypherGuardError(f"Only read queries are allowed (query type '{query_type}')")
+
+        problems: List[str] = []
+        for operator in _walk_plan(plan or {}):
+            operator_type = operator.get("operatorType", "")
+            arguments = operator.get("args") or operator.get("arguments") or {}
+            estimated_rows = arguments.get("EstimatedRows", 0) or 0
+
+            if estimated_rows <= self.max_estimated_rows:
+                continue
+
+            if "CartesianProduct" in operator_type:
+                problems.append(f"cartesian product (~{estimated_rows:,.0f} rows)")
+            elif ("VarLengthExpand" in operator_type or "ShortestPath" in operator_type) and \
+                    UNBOUNDED_EXPANSION.search(str(arguments.get("Details", ""))):
+                problems.append(f"unbounded expansion (~{estimated_rows:,.0f} rows)")
+
+        if problems:
+            raise CypherGuardError(
+                f"Query rejected by cost guard: {', '.join(problems)} "
+                f"exceeds {self.max_estimated_rows:,} estimated rows"
+            )
+
+    def add_limit(self, cypher: str) -> Tuple[str, Optional[int]]:
+        """Append LIMIT to the final RETURN clause if it has none.
+
+        The appended LIMIT is default_limit + 1: a result with more than
+        default_limit rows was capped, and the caller drops the extra row.
+
+        Returns:
+            Tuple of (query, row cap or None if the query was left unbounded or already limited)
+        """
+        cypher = cypher.strip().rstrip(";").strip()
+        upper = cypher.upper()
+
+        if re.search(r"\bUNION\b", upper):
+            return cypher, None
+
+        last_return = upper.rfind("RETURN")
+        if last_return == -1:
+            return cypher, None
+
+        tail = upper[last_return:]
+        if re.search(r"\bLIMIT\b", tail) or "}" in tail:
+            return cypher, None
+
+        return f"{cypher}\nLIMIT {self.default_limit + 1}", self.default_limit
+
+    def check(self, driver, cypher: str, params: Dict[str, Any] = None) -> Tuple[str, Optional[int]]:
+        """EXPLAIN a query, validate its plan and return the query to execute.
+
+        Args:
+            driver: Neo4j driver
+            cypher: Generated Cypher query
+            params: Query parameters
+
+        Returns:
+            Tuple of (query to execute, row cap added by the guard or None)
+        """
+        _, summary, _ = driver.execute_query(f"EXPLAIN {cypher}", params or {}, database_=self.database)
+        self.validate_plan(summary.plan, summary.query_type)
+        return self.add_limit(cypher)
+
+    async def acheck(self, driver, cypher: str, params: Dict[str, Any] = None) -> Tuple[str, Optional[int]]:
+        """Async counterpart of check for the async Neo4j driver."""
+        _, summary, _ = await driver.execute_query(f"EXPLAIN {cypher}", params or {}, database_=self.database)
+        self.validate_plan(summary.plan, summary.query_type)
+        return self.add_limit(cypher)
@@ -0,0 +1,136 @@
+"""
+Parameterized Generated Cypher
+==============================
+
+Neo4j caches query plans by query text, so generated Cypher with inlined
+literals ("python", "google") is planned from scratch for every question.
+The generation prompt asks for `$parameters` with the values on a trailing
+`// params: {...}` comment. This module splits that map off, moves any
+remaining string literals into parameters, normalizes values compared
+against entity keys and validates the map before the query is executed.
+Structurally identical questions then share one cached plan.
+"""
+
+import re
+import json
+from typing import Dict, Any, Tuple
+
+from utils.common import STRING_LITERAL, is_scalar
+from utils.entity_search import normalize_key, normalize_key_literals
+
+# Trailing comment carrying the parameter map
+PARAMS_COMMENT = re.compile(r"^\s*//\s*params\s*:\s*(\{.*\})\s*$", re.IGNORECASE | re.MULTILINE)
+LINE_COMMENT = re.compile(r"^\s*//.*$", re.MULTILINE)
+
+PARAMETER = re.compile(r"\$(\w+)")
+
+# Parameters compared against the normalized key property
+KEY_PARAMETER = re.compile(
+    r"(?:\.key\s*(?:=|\bIN\b|\bCONTAINS\b|\bSTARTS\s+WITH\b|\bENDS\s+WITH\b)\s*|\bkey\s*:\s*)\$(\w+)"
+    r"|\$(\w+)\s*(?:=|CONTAINS)\s*\w+\.key\b",
+    re.IGNORECASE
+)
+
+MAX_STRING_LENGTH = 200
+MAX_LIST_LENGTH = 100
+
+
+class CypherParamsError(ValueError):
+    """Raised when generated Cypher and its parameter map do not match."""
+
+
+def split_params(generated: str) -> Tuple[str, Dict[str, Any]]:
+    """Separate the `// params: {...}` map from the generated query.
+
+    Args:
+        generated: Cypher as returned by the generation step
+
+    Returns:
+        Tuple of (query without comments, parameter map)
+    """
+    params: Dict[str, Any] = {}
+    for match in PARAMS_COMMENT.finditer(generated):
+        try:
+            value = json.loads(match.group(1))
+        except json.JSONDecodeError as e:
+            raise CypherParamsError(f"Invalid parameter map {match.group(1)!r}: {e}")
+        if not isinstance(value, dict):
+            raise CypherParamsError("Parameter map must be a JSON object")
+        params.update(value)
+
+    cypher = LINE_COMMENT.sub("", generated)
+    return "\n".join(line for line in cypher.splitlines() if line.strip()), params
+
+
+def parameterize_literals(cypher: str, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Replace string literals left in the query by parameters ($p0, $p1, ...)."""
+    params = dict(params)
+    names: Dict[str, str] = {}
+
+    def replace(match) -> str:
+        value = match.group(2).replace(f"\\{match.group(1)}", match.group(1))
+        if value not in names:
+            name = f"p{len(names)}"
+            while name in params:
+                name = f"{name}_"
+            names[value] = name
+            params[name] = value
+        return f"${names[value]}"
+
+    return STRING_LITERAL.sub(replace, cypher), params
+
+
+def validate_params(cypher: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Check that every referenced parameter has a plain value and drop unused ones.
+
+    Args:
+        cypher: Parameterized query
+        params: Parameter map
+
+    Returns:
+        Dict: Parameters referenced by the query
+    """
+    referenced = set(PARAMETER.findall(cypher))
+
+    missing = referenced - params.keys()
+    if missing:
+        raise CypherParamsError(f"Missing values for parameters: {', '.join(sorted(missing))}")
+
+    for name in referenced:
+        value = params[name]
+        values = value if isinstance(value, list) else [value]
+        if len(values) > MAX_LIST_LENGTH or not all(is_scalar(v) for v in values):
+            raise CypherParamsError(f"Parameter ${name} must be a scalar or a short list of scalars")
+        if any(isinstance(v, str) and len(v) > MAX_STRING_LENGTH for v in values):
+            raise CypherParamsError(f"Parameter ${name} is too long")
+
+    return {name: params[name] for name in referenced}
+
+
+def normalize_key_params(cypher: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize parameter values compared against the key property."""
+    params = dict(params)
+    for match in KEY_PARAMETER.finditer(cypher):
+        name = match.group(1) or match.group(2)
+        value = params.get(name)
+        if isinstance(value, str):
+            params[name] = normalize_key(value)
+        elif isinstance(value, list):
+            params[name] = [normalize_key(v) if isinstance(v, str) else v for v in value]
+    return params
+
+
+def prepare_generated_cypher(generated: str) -> Tuple[str, Dict[str, Any]]:
+    """Turn generated Cypher into a parameterized query and a validated parameter map.
+
+    Args:
+        generated: Cypher extracted from the generation step (may carry a params comment)
+
+    Returns:
+        Tuple of (parameterized query, parameters)
+    """
+    cypher, params = split_params(generated)
+    if not cypher:
+        return "", {}
+    cypher, params = parameterize_literals(normalize_key_literals(cypher), params)
+    return cypher, validate_params(cypher, normalize_key_params(cypher, params))
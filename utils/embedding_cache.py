@@ -0,0 +1,246 @@
+"""
+Persistent Embedding Cache
+==========================
+
+SQLite-backed cache of document embeddings keyed by the SHA-256 of the
+chunk text and the embedding model name. Rebuilding the vector store only
+pays for chunks whose text is new, and identical boilerplate chunks shared
+by many CVs are embedded once.
+
+Vectors are stored as packed float32 blobs in a single SQLite file (WAL
+mode), so the cache can be shared by several processes.
+
+Query embeddings get their own in-memory LRU (optionally backed by the same
+SQLite file), so repeated questions skip the embedding API round trip.
+"""
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Tuple, Any, Optional
+import logging
+
+from langchain_core.embeddings import Embeddings
+
+from utils.common import sqlite_connect
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    """Hash chunk text for use as a cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store, shareable across processes."""
+
+    def __init__(self, path: str):
+        """Initialize the cache and create the backing table if needed.
+
+        Args:
+            path: Location of the SQLite file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with sqlite_connect(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the given text hashes."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with sqlite_connect(self.path) as conn:
+            for start in range(0, len(unique), LOOKUP_BATCH_SIZE):
+                batch = unique[start:start + LOOKUP_BATCH_SIZE]
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors keyed by text hash."""
+        now = time.time()
+        with sqlite_connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [(model, key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+            )
+
+    def count(self, model: str = None) -> int:
+        """Number of cached vectors (for one model, or all)."""
+        with sqlite_connect(self.path) as conn:
+            if model is None:
+                return conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            return conn.execute("SELECT count(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all cached vectors."""
+        with sqlite_connect(self.path) as conn:
+            conn.execute("DELETE FROM embeddings")
+        logger.info("✓ Embedding cache cleared")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves document embeddings from an EmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: str):
+        """Wrap an embeddings client.
+
+        Args:
+            embeddings: Underlying LangChain embeddings client
+            cache: Persistent cache
+            model: Embedding model name (part of the cache key)
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, hashes)
+        missing = {key: text for key, text in zip(hashes, texts) if key not in vectors}
+        return hashes, vectors, missing
+
+    def _complete(self, hashes: List[str], vectors: Dict[str, List[float]], missing: Dict[str, str],
+                  new_vectors: List[List[float]]) -> List[List[float]]:
+        if missing:
+            new_vectors = dict(zip(missing, new_vectors))
+            self.cache.put_many(self.model, new_vectors)
+            vectors.update(new_vectors)
+
+        logger.debug(f"Embedding cache: {len(hashes) - len(missing)}/{len(hashes)} chunks reused, "
+                     f"{len(missing)} embedded")
+        return [vectors[key] for key in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, calling the underlying client only for uncached, distinct texts."""
+        hashes, vectors, missing = self._lookup(texts)
+        new_vectors = self.embeddings.embed_documents(list(missing.values())) if missing else []
+        return self._complete(hashes, vectors, missing, new_vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async counterpart of embed_documents."""
+        hashes, vectors, missing = self._lookup(texts)
+        new_vectors = await self.embeddings.aembed_documents(list(missing.values())) if missing else []
+        return self._complete(hashes, vectors, missing, new_vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Query embeddings are not cached here."""
+        return self.embeddings.embed_query(text)
+
+
+class QueryCachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an LRU cache for query embeddings and hit-rate metrics."""
+
+    def __init__(self, embeddings: Embeddings, model: str, max_entries: int = 1024,
+                 persistent_cache: Optional[EmbeddingCache] = None):
+        """Wrap an embeddings client.
+
+        Args:
+            embeddings: Underlying LangChain embeddings client (documents are delegated)
+            model: Embedding model name (part of the cache key)
+            max_entries: Query embeddings kept in memory
+            persistent_cache: Optional on-disk cache consulted on memory misses
+        """
+        self.embeddings = embeddings
+        self.model = model
+        self.namespace = f"query:{model}"
+        self.max_entries = max_entries
+        self.persistent_cache = persistent_cache
+
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vector: List[float], miss: bool = False) -> None:
+        with self._lock:
+            if miss:
+                self.misses += 1
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _cached(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        if self.persistent_cache:
+            vector = self.persistent_cache.get_many(self.namespace, [key]).get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+        return None
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector, miss=True)
+        if self.persistent_cache:
+            self.persistent_cache.put_many(self.namespace, {key: vector})
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, serving repeated questions from the cache."""
+        key = text_hash(text)
+        vector = self._cached(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async counterpart of embed_query."""
+        key = text_hash(text)
+        vector = self._cached(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self._store(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for the query cache."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,80 @@
+"""
+Concurrent Batched Embedding
+============================
+
+Embeds large numbers of chunks with several batched requests in flight at
+once instead of one long sequential chain of API calls. Rate-limit (429)
+responses are retried with exponential backoff, honouring Retry-After when
+the API provides it.
+"""
+
+import asyncio
+import random
+import time
+from typing import List, Dict, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds requested by the API's Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def aembed_in_batches(embeddings, texts: List[str], batch_size: int = 64, concurrency: int = 4,
+                            max_retries: int = 6) -> Tuple[List[List[float]], Dict[str, Any]]:
+    """Embed texts in concurrent batches, preserving order.
+
+    Args:
+        embeddings: LangChain embeddings client (uses aembed_documents)
+        texts: Texts to embed
+        batch_size: Texts per embedding request
+        concurrency: Maximum requests in flight
+        max_retries: Retries per batch on rate-limit errors
+
+    Returns:
+        Tuple of (vectors in input order, report with timings and retry counts)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    retries = 0
+
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        nonlocal retries
+        for attempt in range(max_retries + 1):
+            async with semaphore:
+                try:
+                    return await embeddings.aembed_documents(batch)
+                except Exception as e:
+                    if not _is_rate_limit(e) or attempt == max_retries:
+                        raise
+                    wait = _retry_after(e)
+            # Back off outside the semaphore so other batches can use the slot
+            retries += 1
+            delay = max(wait, min(60.0, 2 ** attempt)) + random.uniform(0, 1)
+            logger.warning(f"Embedding rate limited, retrying batch in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    elapsed = time.perf_counter() - start
+
+    vectors = [vector for batch_vectors in results for vector in batch_vectors]
+    report = {
+        "chunks": len(texts),
+        "batches": len(batches),
+        "retries": retries,
+        "seconds": round(elapsed, 2),
+        "chunks_per_second": round(len(texts) / elapsed, 1) if elapsed > 0 else None,
+    }
+    return vectors, report
@@ -0,0 +1,159 @@
+"""
+Full-text Entity Search
+=======================
+
+Ingestion creates a full-text (Lucene) index over the ids of the main CV
+entities. Name lookups through `db.index.fulltext.queryNodes` use the index
+instead of scanning every node with toLower(), and fuzzy terms make them
+tolerant to typos ("Pyhton", "Kubernets").
+
+For exact lookups every entity also carries a normalized `key` property
+(lowercased, whitespace and punctuation folded) backed by range indexes, so
+`s.key = "nodejs"` is an index seek rather than a toLower() label scan.
+"""
+
+import re
+from typing import List, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTITY_FULLTEXT_INDEX = "entity_names"
+
+# Labels whose ids are covered by the full-text index
+FULLTEXT_LABELS = ["Person", "Skill", "Company", "University", "Certification", "Location"]
+
+CREATE_FULLTEXT_INDEX = (
+    f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS "
+    f"FOR (n:{'|'.join(FULLTEXT_LABELS)}) ON EACH [n.id]"
+)
+
+# Range indexes on the normalized key; per label so `(s:Skill) WHERE s.key = ...` can seek
+CREATE_KEY_INDEXES = [
+    f"CREATE INDEX {label.lower()}_key IF NOT EXISTS FOR (n:{label}) ON (n.key)"
+    for label in FULLTEXT_LABELS
+] + ["CREATE INDEX entity_key IF NOT EXISTS FOR (e:__Entity__) ON (e.key)"]
+
+SET_ENTITY_KEYS_QUERY = """
+UNWIND $entities AS entity
+MATCH (n:__Entity__ {id: entity.id})
+SET n.key = entity.key
+"""
+
+# Entities without a key (graphs loaded from a dump or built by older ingestion)
+MISSING_KEYS_QUERY = """
+MATCH (n) WHERE n.key IS NULL AND n.id IS NOT NULL
+  AND any(label IN labels(n) WHERE label IN $labels)
+RETURN elementId(n) AS element_id, n.id AS id
+"""
+
+SET_KEYS_BY_ELEMENT_ID_QUERY = """
+UNWIND $entities AS entity
+MATCH (n) WHERE elementId(n) = entity.element_id
+SET n.key = entity.key
+"""
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Everything except letters, digits, + and # (kept so C, C++ and C# stay distinct)
+KEY_FOLD = re.compile(r"[^\w+#]|_")
+
+# Quoted literals compared against a key in generated Cypher
+KEY_EQUALS_LITERAL = re.compile(
+    r"""((?:\.key\s*(?:=|\bCONTAINS\b|\bSTARTS\s+WITH\b|\bENDS\s+WITH\b)|\bkey\s*:)\s*)(["'])(.*?)\2""",
+    re.IGNORECASE
+)
+KEY_IN_LIST = re.compile(r"(\.key\s+IN\s+\[)([^\]]*)(\])", re.IGNORECASE)
+QUOTED = re.compile(r"""(["'])(.*?)\1""")
+
+# Characters with a special meaning in Lucene query syntax
+LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def normalize_key(name: str) -> str:
+    """Normalize an entity name into its lookup key ("Node.js" -> "nodejs")."""
+    return KEY_FOLD.sub("", str(name).casefold())
+
+
+def normalize_key_literals(cypher: str) -> str:
+    """Normalize the literals that generated Cypher compares against `.key`.
+
+    The prompt asks for pre-normalized values; this makes sure they match the
+    ingestion-side normalization exactly ("React.js" -> "reactjs").
+    """
+    def normalize_quoted(match):
+        return f"{match.group(1)}{normalize_key(match.group(2))}{match.group(1)}"
+
+    cypher = KEY_EQUALS_LITERAL.sub(
+        lambda m: f"{m.group(1)}{m.group(2)}{normalize_key(m.group(3))}{m.group(2)}", cypher
+    )
+    return KEY_IN_LIST.sub(
+        lambda m: f"{m.group(1)}{QUOTED.sub(normalize_quoted, m.group(2))}{m.group(3)}", cypher
+    )
+
+
+def set_entity_keys(graph, entity_ids: List[str]) -> None:
+    """Write the normalized key property on the given entities."""
+    entities = [{"id": entity_id, "key": normalize_key(entity_id)} for entity_id in set(entity_ids)]
+    if entities:
+        graph.query(SET_ENTITY_KEYS_QUERY, {"entities": entities})
+
+
+def ensure_entity_keys(graph) -> int:
+    """Create the full-text and key indexes and set `key` on entities that lack it.
+
+    Idempotent: on a graph built by the current ingestion only the (no-op)
+    index creation and one lookup run. Keys are computed with normalize_key in
+    Python, exactly as at ingestion.
+
+    Args:
+        graph: Neo4jGraph instance
+
+    Returns:
+        int: Number of entities whose key was backfilled
+    """
+    graph.query(CREATE_FULLTEXT_INDEX)
+    for query in CREATE_KEY_INDEXES:
+        graph.query(query)
+
+    rows = graph.query(MISSING_KEYS_QUERY, {"labels": ["__Entity__"] + FULLTEXT_LABELS})
+    entities = [{"element_id": row["element_id"], "key": normalize_key(row["id"])} for row in rows]
+    for start in range(0, len(entities), BACKFILL_BATCH_SIZE):
+        graph.query(SET_KEYS_BY_ELEMENT_ID_QUERY, {"entities": entities[start:start + BACKFILL_BATCH_SIZE]})
+
+    if entities:
+        logger.info(f"✓ Normalized key backfilled on {len(entities)} entities")
+    return len(entities)
+
+
+def fuzzy_lucene_query(text: str) -> str:
+    """Build a Lucene query where every term must match, allowing small typos."""
+    terms = [LUCENE_SPECIAL.sub(r"\\\1", term) for term in text.split()]
+    return " AND ".join(f"{term}~" for term in terms if term)
+
+
+def search_entities(graph, text: str, label: str = None, limit: int = 5) -> List[Dict[str, Any]]:
+    """Find entities whose name matches the text, best matches first.
+
+    Args:
+        graph: Neo4jGraph instance
+        text: Entity name as written in the question (may contain typos)
+        label: Optional label the entity must have
+        limit: Maximum number of matches
+
+    Returns:
+        List of {"id", "label", "score"} dicts
+    """
+    query = fuzzy_lucene_query(text)
+    if not query:
+        return []
+
+    return graph.query(
+        f"""
+        CALL db.index.fulltext.queryNodes('{ENTITY_FULLTEXT_INDEX}', $query) YIELD node, score
+        WHERE $label IS NULL OR $label IN labels(node)
+        RETURN node.id AS id, [l IN labels(node) WHERE l <> '__Entity__'][0] AS label, score
+        ORDER BY score DESC LIMIT $limit
+        """,
+        {"query": query, "label": label, "limit": limit}
+    )
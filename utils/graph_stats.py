@@ -0,0 +1,222 @@
+"""
+Graph Statistics Helpers
+========================
+
+Shared helpers for the bookkeeping node that ingestion maintains in Neo4j.
+
+The node carries a monotonically increasing `epoch` counter that is bumped
+after every write batch, so readers (answer cache, schema snapshot) can tell
+whether the graph changed since they last looked at it.
+"""
+
+from typing import List, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Label of the single bookkeeping node (kept out of the LLM schema)
+GRAPH_STATS_LABEL = "__GraphStats__"
+
+GRAPH_EPOCH_QUERY = f"MATCH (s:{GRAPH_STATS_LABEL} {{id: 'global'}}) RETURN s.epoch AS epoch"
+
+
+def get_graph_epoch(graph) -> int:
+    """Return the current graph epoch (0 if the graph was never written).
+
+    Args:
+        graph: Neo4jGraph instance
+
+    Returns:
+        int: Current epoch counter
+    """
+    result = graph.query(GRAPH_EPOCH_QUERY)
+    if not result or result[0].get("epoch") is None:
+        return 0
+    return result[0]["epoch"]
+
+
+def bump_graph_epoch(graph) -> int:
+    """Increment the graph epoch after a write batch.
+
+    Args:
+        graph: Neo4jGraph instance
+
+    Returns:
+        int: New epoch counter
+    """
+    result = graph.query(
+        f"""
+        MERGE (s:{GRAPH_STATS_LABEL} {{id: 'global'}})
+        SET s.epoch = coalesce(s.epoch, 0) + 1,
+            s.updated_at = datetime()
+        RETURN s.epoch AS epoch
+        """
+    )
+    epoch = result[0]["epoch"]
+    logger.debug(f"Graph epoch bumped to {epoch}")
+    return epoch
+
+
+# Nodes that carry a materialized person_count (people connected to them)
+AGGREGATE_LABELS = ["Skill", "Company", "University", "Location", "Certification"]
+
+
+def update_materialized_aggregates(graph, nodes: List[Dict[str, str]]) -> None:
+    """Refresh materialized counters after a write batch.
+
+    Only the aggregate nodes written in the batch are recomputed, since new
+    Person relationships can only point at nodes from the same batch. The
+    global per-label counters on the stats node come from the count store.
+
+    Args:
+        graph: Neo4jGraph instance
+        nodes: Nodes written in the batch, as {"label": ..., "id": ...} dicts
+    """
+    touched = [node for node in nodes if node["label"] in AGGREGATE_LABELS]
+    if touched:
+        graph.query(
+            """
+            UNWIND $nodes AS node
+            MATCH (n:__Entity__ {id: node.id})
+            WHERE node.label IN labels(n)
+            CALL {
+                WITH n
+                MATCH (p:Person)-->(n)
+                RETURN count(DISTINCT p) AS people
+            }
+            SET n.person_count = people
+            """,
+            {"nodes": touched}
+        )
+
+    counters = ["Person"] + AGGREGATE_LABELS
+    subqueries = "\n".join(
+        f"CALL {{ MATCH (n:{label}) RETURN count(n) AS {label.lower()}_count }}" for label in counters
+    )
+    assignments = ", ".join(f"s.{label.lower()}_count = {label.lower()}_count" for label in counters)
+    graph.query(
+        f"""
+        MERGE (s:{GRAPH_STATS_LABEL} {{id: 'global'}})
+        WITH s
+        {subqueries}
+        SET {assignments}
+        """
+    )
+    logger.debug(f"Materialized aggregates updated for {len(touched)} nodes")
+
+
+def recompute_materialized_aggregates(graph, missing_only: bool = False) -> int:
+    """Recompute person_count on every aggregate node, plus the global counters.
+
+    Graphs loaded from a dump or built before person_count existed have no
+    counters, and the "most common X" templates would find nothing.
+
+    Args:
+        graph: Neo4jGraph instance
+        missing_only: Only fill nodes without a person_count (cheap, idempotent startup check)
+
+    Returns:
+        int: Number of nodes updated
+    """
+    result = graph.query(
+        """
+        MATCH (n) WHERE any(label IN labels(n) WHERE label IN $labels)
+          AND (NOT $missing_only OR n.person_count IS NULL)
+        CALL {
+            WITH n
+            MATCH (p:Person)-->(n)
+            RETURN count(DISTINCT p) AS people
+        }
+        SET n.person_count = people
+        RETURN count(n) AS updated
+        """,
+        {"labels": AGGREGATE_LABELS, "missing_only": missing_only}
+    )
+    updated = result[0]["updated"] if result else 0
+
+    stats = graph.query(f"MATCH (s:{GRAPH_STATS_LABEL} {{id: 'global'}}) RETURN s.person_count AS people")
+    if updated or not missing_only or not stats or stats[0]["people"] is None:
+        update_materialized_aggregates(graph, [])
+
+    if updated:
+        logger.info(f"✓ Materialized person_count recomputed on {updated} nodes")
+    return updated
+
+
+# Labels maintained by LangChain / this project rather than extracted from CVs
+HIDDEN_LABELS = ("__Entity__", GRAPH_STATS_LABEL)
+
+# Count-store statistics, epoch and sample data in a single round trip (APOC)
+GRAPH_STATS_QUERY = f"""
+CALL apoc.meta.stats() YIELD labels, relTypesCount, nodeCount, relCount
+OPTIONAL MATCH (s:{GRAPH_STATS_LABEL} {{id: 'global'}})
+CALL {{ MATCH (p:Person) WITH p LIMIT 3 RETURN collect(p.id) AS sample_people }}
+CALL {{ MATCH (k:Skill) WITH k LIMIT 5 RETURN collect(k.id) AS sample_skills }}
+RETURN labels, relTypesCount AS rel_types, nodeCount AS node_count, relCount AS rel_count,
+       coalesce(s.epoch, 0) AS epoch, sample_people, sample_skills
+"""
+
+
+def _identifier(name: str) -> str:
+    """Backtick-quote a label or relationship type name for use as an identifier."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _fetch_graph_stats_without_apoc(graph) -> dict:
+    """Fallback for servers without APOC: token lookup plus one UNION ALL of count-store counts."""
+    tokens = graph.query("""
+        CALL { CALL db.labels() YIELD label RETURN collect(label) AS labels }
+        CALL { CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS rel_types }
+        CALL { MATCH (p:Person) WITH p LIMIT 3 RETURN collect(p.id) AS sample_people }
+        CALL { MATCH (k:Skill) WITH k LIMIT 5 RETURN collect(k.id) AS sample_skills }
+        RETURN labels, rel_types, sample_people, sample_skills
+    """)[0]
+
+    # Names are only used as (escaped) identifiers; rows carry the token's position
+    # and the name is attached in Python, so quotes in names cannot break the query
+    parts = ["MATCH (n) RETURN 'node' AS kind, 0 AS position, count(n) AS count",
+             "MATCH ()-[r]->() RETURN 'rel' AS kind, 0 AS position, count(r) AS count"]
+    parts += [f"MATCH (n:{_identifier(label)}) RETURN 'label' AS kind, {i} AS position, count(n) AS count"
+              for i, label in enumerate(tokens["labels"])]
+    parts += [f"MATCH ()-[r:{_identifier(rel_type)}]->() RETURN 'type' AS kind, {i} AS position, count(r) AS count"
+              for i, rel_type in enumerate(tokens["rel_types"])]
+
+    stats = {"labels": {}, "rel_types": {}, "node_count": 0, "rel_count": 0,
+             "sample_people": tokens["sample_people"], "sample_skills": tokens["sample_skills"]}
+    for row in graph.query(" UNION ALL ".join(parts)):
+        if row["kind"] == "node":
+            stats["node_count"] = row["count"]
+        elif row["kind"] == "rel":
+            stats["rel_count"] = row["count"]
+        elif row["kind"] == "label":
+            stats["labels"][tokens["labels"][row["position"]]] = row["count"]
+        else:
+            stats["rel_types"][tokens["rel_types"][row["position"]]] = row["count"]
+
+    stats["epoch"] = get_graph_epoch(graph)
+    return stats
+
+
+def fetch_graph_stats(graph) -> dict:
+    """Fetch label, relationship type and total counts plus sample data.
+
+    Uses the count store through apoc.meta.stats(), so the cost does not grow
+    with the graph size.
+
+    Args:
+        graph: Neo4jGraph instance
+
+    Returns:
+        dict: labels / rel_types count maps, node_count, rel_count, epoch and samples
+    """
+    try:
+        stats = dict(graph.query(GRAPH_STATS_QUERY)[0])
+    except Exception as e:
+        logger.debug(f"apoc.meta.stats() unavailable, using fallback: {e}")
+        stats = _fetch_graph_stats_without_apoc(graph)
+
+    # The bookkeeping node is not part of the CV data
+    stats["node_count"] -= stats["labels"].get(GRAPH_STATS_LABEL, 0)
+    stats["labels"] = {label: count for label, count in stats["labels"].items() if count > 0}
+    stats["rel_types"] = {rel_type: count for rel_type, count in stats["rel_types"].items() if count > 0}
+    return stats
@@ -0,0 +1,273 @@
+"""
+Intent Router for GraphRAG Queries
+==================================
+
+Maps the most common question shapes (count people with skill X, who has
+X and Y, who worked at company Z, ...) to pre-written, parameterized Cypher
+templates. Entity names are resolved against a vocabulary loaded from the
+graph, so matched questions are answered without any LLM call. Questions
+that do not match a template return None and fall back to the LLM chain.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Optional, Callable
+import logging
+
+from utils.common import normalize_question
+from utils.graph_stats import GRAPH_STATS_LABEL, AGGREGATE_LABELS
+
+logger = logging.getLogger(__name__)
+
+# Node labels whose ids make up the entity vocabulary
+ENTITY_LABELS = ["Skill", "Company", "University", "Location", "Certification"]
+
+# Words that often follow an entity name without being part of it
+FILLER_SUFFIX = re.compile(
+    r"\s+(?:programming|development)?\s*(?:skills?|experience|expertise|knowledge)$"
+)
+
+# Minimum similarity between the question fragment and a full-text match
+FUZZY_MIN_RATIO = 0.8
+
+PEOPLE = r"(?:people|persons|candidates|developers|programmers|engineers|professionals)"
+
+# Cypher templates, one per supported intent
+CYPHER_TEMPLATES = {
+    "count_people": """
+        MATCH (p:Person)
+        RETURN count(p) AS count
+    """,
+    "count_skill": """
+        MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)
+        WHERE s.id IN $skill
+        RETURN count(DISTINCT p) AS count
+    """,
+    "count_skill_pair": """
+        MATCH (p:Person)-[:HAS_SKILL]->(s1:Skill), (p)-[:HAS_SKILL]->(s2:Skill)
+        WHERE s1.id IN $skill AND s2.id IN $other_skill
+        RETURN count(DISTINCT p) AS count
+    """,
+    "count_company": """
+        MATCH (p:Person)-[:WORKED_AT]->(c:Company)
+        WHERE c.id IN $company
+        RETURN count(DISTINCT p) AS count
+    """,
+    "count_location": """
+        MATCH (p:Person)-[:LOCATED_IN]->(l:Location)
+        WHERE l.id IN $location
+        RETURN count(DISTINCT p) AS count
+    """,
+    "people_with_skill": """
+        MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)
+        WHERE s.id IN $skill
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+    "people_with_skill_pair": """
+        MATCH (p:Person)-[:HAS_SKILL]->(s1:Skill), (p)-[:HAS_SKILL]->(s2:Skill)
+        WHERE s1.id IN $skill AND s2.id IN $other_skill
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+    "people_at_company": """
+        MATCH (p:Person)-[:WORKED_AT]->(c:Company)
+        WHERE c.id IN $company
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+    "people_at_university": """
+        MATCH (p:Person)-[:STUDIED_AT]->(u:University)
+        WHERE u.id IN $university
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+    "people_in_location": """
+        MATCH (p:Person)-[:LOCATED_IN]->(l:Location)
+        WHERE l.id IN $location
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+    "people_with_certification": """
+        MATCH (p:Person)-[:EARNED]->(c:Certification)
+        WHERE c.id IN $certification
+        RETURN DISTINCT p.id AS name ORDER BY name
+    """,
+}
+
+# "Most common X" rankings read the person_count materialized at ingest
+# instead of traversing every relationship
+for _label in AGGREGATE_LABELS:
+    CYPHER_TEMPLATES[f"top_{_label.lower()}"] = f"""
+        MATCH (n:{_label}) WHERE n.person_count > 0
+        OPTIONAL MATCH (s:{GRAPH_STATS_LABEL} {{id: 'global'}})
+        RETURN n.id AS name, n.person_count AS count, s.person_count AS total
+        ORDER BY count DESC, name LIMIT 10
+    """
+
+# Question patterns, matched against the normalized (lowercase) question.
+# Named groups are entity slots; the group name selects the vocabulary label.
+INTENT_PATTERNS = [
+    ("count_people", rf"^how many {PEOPLE} are (?:there|in the (?:knowledge graph|graph|database))$"),
+    ("count_skill_pair", rf"^how many {PEOPLE} (?:have|know) both (?P<skill>.+?) and (?P<other_skill>.+?)$"),
+    ("count_skill", rf"^how many {PEOPLE} (?:have|know|with) (?P<skill>.+?)$"),
+    ("count_skill", rf"^how many (?P<skill>.+?) {PEOPLE} (?:do we have|are there)$"),
+    ("count_company", rf"^how many {PEOPLE} (?:have )?worked (?:at|for) (?P<company>.+?)$"),
+    ("count_location", rf"^how many {PEOPLE} are (?:located|based) in (?P<location>.+?)$"),
+    ("people_with_skill_pair", rf"^(?:who (?:has|knows)|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} (?:with|who (?:have|know))) both (?P<skill>.+?) and (?P<other_skill>.+?)$"),
+    ("people_at_company", rf"^(?:who|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} who) (?:has )?worked (?:at|for) (?P<company>.+?)$"),
+    ("people_at_university", rf"^(?:who|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} who) studied at (?P<university>.+?)$"),
+    ("people_in_location", rf"^(?:who is (?:located|based) in|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} (?:located |based )?in) (?P<location>.+?)$"),
+    ("people_with_certification", rf"^(?:who has|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} with) (?P<certification>.+?) certifications?$"),
+    # Only generic wording: narrower categories ("programming languages") fall through to the LLM
+    ("top_skill", r"^(?:what|which) (?:skills|technologies) are (?:the )?most common(?: in our database)?$"),
+    ("top_skill", r"^what are the most common (?:skills|technologies)$"),
+    ("top_company", r"^(?:what|which) companies have the most (?:former )?employees(?: in our database)?$"),
+    ("top_company", r"^(?:what|which) companies are (?:the )?most common(?: in our database)?$"),
+    ("top_location", rf"^(?:what|which) (?:cities|locations) have the most {PEOPLE}$"),
+    ("top_university", r"^(?:what|which) universities are (?:the )?most common(?: in our database)?$"),
+    ("top_certification", r"^what are the most common certifications$"),
+    ("people_with_skill", rf"^(?:who (?:has|knows)|(?:find|list|show)(?: me)?(?: all)? {PEOPLE} (?:with|who (?:have|know))) (?P<skill>.+?)$"),
+]
+
+# How each intent describes the matched people in the answer
+INTENT_DESCRIPTIONS = {
+    "count_people": "in the knowledge graph",
+    "count_skill": "with {skill} skills",
+    "count_skill_pair": "with both {skill} and {other_skill} skills",
+    "count_company": "who worked at {company}",
+    "count_location": "located in {location}",
+    "people_with_skill": "with {skill} skills",
+    "people_with_skill_pair": "with both {skill} and {other_skill} skills",
+    "people_at_company": "who worked at {company}",
+    "people_at_university": "who studied at {university}",
+    "people_in_location": "located in {location}",
+    "people_with_certification": "with the {certification} certification",
+    "top_skill": "Most common skills",
+    "top_company": "Companies with the most people",
+    "top_university": "Most common universities",
+    "top_location": "Locations with the most people",
+    "top_certification": "Most common certifications",
+}
+
+# Vocabulary label for each slot name
+SLOT_LABELS = {
+    "skill": "Skill",
+    "other_skill": "Skill",
+    "company": "Company",
+    "university": "University",
+    "location": "Location",
+    "certification": "Certification",
+}
+
+
+class IntentRouter:
+    """Routes common questions to parameterized Cypher templates."""
+
+    def __init__(self, entity_search: Optional[Callable[[str, str], List[str]]] = None):
+        """Initialize the router with compiled patterns and an empty vocabulary.
+
+        Args:
+            entity_search: Optional fuzzy lookup (label, text) -> candidate ids, used
+                when a name is not found verbatim in the vocabulary (e.g. typos)
+        """
+        self.entity_search = entity_search
+        self.patterns = [(intent, re.compile(pattern)) for intent, pattern in INTENT_PATTERNS]
+        self.vocabulary: Dict[str, Dict[str, List[str]]] = {label: {} for label in ENTITY_LABELS}
+        self.vocabulary_epoch = None
+
+    def load_vocabulary(self, graph, epoch: int) -> None:
+        """Load entity names from the graph (once per graph epoch).
+
+        Args:
+            graph: Neo4jGraph instance
+            epoch: Current graph epoch
+        """
+        if self.vocabulary_epoch == epoch:
+            return
+
+        vocabulary = {label: {} for label in ENTITY_LABELS}
+        rows = graph.query(
+            """
+            MATCH (n) WHERE any(label IN labels(n) WHERE label IN $labels)
+            RETURN [label IN labels(n) WHERE label IN $labels][0] AS label, n.id AS id
+            """,
+            {"labels": ENTITY_LABELS}
+        )
+        for row in rows:
+            if row["id"]:
+                vocabulary[row["label"]].setdefault(row["id"].lower(), []).append(row["id"])
+
+        self.vocabulary = vocabulary
+        self.vocabulary_epoch = epoch
+        logger.info(f"✓ Intent router vocabulary loaded ({len(rows)} entities)")
+
+    def resolve_entity(self, label: str, span: str) -> Optional[List[str]]:
+        """Resolve a question fragment to the matching node ids of a label."""
+        vocabulary = self.vocabulary.get(label, {})
+        span = span.strip()
+        if span.startswith("the "):
+            span = span[4:]
+
+        candidates = (span, FILLER_SUFFIX.sub("", span).strip())
+        for candidate in candidates:
+            if candidate in vocabulary:
+                return vocabulary[candidate]
+
+        # Typo-tolerant fallback; only accept names close to the whole fragment
+        if self.entity_search:
+            for candidate in candidates:
+                for entity_id in self.entity_search(label, candidate):
+                    if SequenceMatcher(None, candidate, entity_id.lower()).ratio() >= FUZZY_MIN_RATIO:
+                        return vocabulary.get(entity_id.lower(), [entity_id])
+        return None
+
+    def route(self, question: str) -> Optional[Dict[str, Any]]:
+        """Match a question to a template.
+
+        Args:
+            question: Natural language question
+
+        Returns:
+            Dict with intent, cypher and params, or None if no template applies
+        """
+        normalized = normalize_question(question)
+
+        for intent, pattern in self.patterns:
+            match = pattern.match(normalized)
+            if not match:
+                continue
+
+            params = {}
+            for slot, span in match.groupdict().items():
+                ids = self.resolve_entity(SLOT_LABELS[slot], span)
+                if not ids:
+                    break
+                params[slot] = ids
+            else:
+                return {
+                    "intent": intent,
+                    "cypher": " ".join(CYPHER_TEMPLATES[intent].split()),
+                    "params": params
+                }
+
+        return None
+
+    def format_answer(self, route: Dict[str, Any], rows: List[Dict[str, Any]]) -> str:
+        """Render the template result as a human readable answer."""
+        intent = route["intent"]
+        description = INTENT_DESCRIPTIONS[intent].format(
+            **{slot: ids[0] for slot, ids in route["params"].items()}
+        )
+
+        if intent.startswith("top_"):
+            if not rows:
+                return f"{description}: no data available."
+            total = rows[0].get("total")
+            of_total = f" of {total}" if total else ""
+            items = ", ".join(f"{row['name']} ({row['count']}{of_total} people)" for row in rows)
+            return f"{description}: {items}."
+
+        if intent.startswith("count_"):
+            count = rows[0]["count"] if rows else 0
+            return f"There are {count} people {description}."
+
+        names = [row["name"] for row in rows if row.get("name")]
+        if not names:
+            return f"No people {description} were found."
+        return f"{len(names)} people {description}: {', '.join(names)}."
@@ -0,0 +1,107 @@
+"""
+Shared Neo4j Connection Factory
+===============================
+
+Single place where scripts obtain Neo4j connections. Credentials come from
+the environment (.env), pool tuning from the [neo4j] section of
+utils/config.toml, so 0_setup.py, the ingestion script, the GraphRAG system
+and the Streamlit app all connect the same way.
+"""
+
+import os
+from typing import Dict, Any
+import logging
+import toml
+
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from langchain_neo4j import Neo4jGraph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "utils/config.toml"
+
+# Driver options that may be tuned from config.toml
+POOL_OPTIONS = [
+    "max_connection_pool_size",
+    "max_connection_lifetime",
+    "connection_acquisition_timeout",
+    "liveness_check_timeout",
+    "keep_alive",
+    "fetch_size",
+]
+
+
+def _neo4j_config(config: dict = None) -> dict:
+    """Return the [neo4j] config section, loading config.toml if needed."""
+    if config is None:
+        if not os.path.exists(DEFAULT_CONFIG_PATH):
+            return {}
+        with open(DEFAULT_CONFIG_PATH, 'r') as f:
+            config = toml.load(f)
+    return config.get('neo4j', {})
+
+
+def get_neo4j_settings() -> Dict[str, str]:
+    """Return connection settings from the environment."""
+    return {
+        "url": os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        "username": os.getenv("NEO4J_USERNAME", "neo4j"),
+        "password": os.getenv("NEO4J_PASSWORD", "password123"),
+        "database": os.getenv("NEO4J_DATABASE", "neo4j"),
+    }
+
+
+def get_driver_config(config: dict = None) -> Dict[str, Any]:
+    """Return the pool options configured for the Neo4j driver."""
+    neo4j_config = _neo4j_config(config)
+    return {option: neo4j_config[option] for option in POOL_OPTIONS if option in neo4j_config}
+
+
+def create_graph(config: dict = None, **graph_kwargs) -> Neo4jGraph:
+    """Create a Neo4jGraph backed by a tuned connection pool.
+
+    Args:
+        config: Loaded config.toml (read from disk if omitted)
+        **graph_kwargs: Extra Neo4jGraph arguments (timeout, refresh_schema, ...)
+
+    Returns:
+        Neo4jGraph: Connected graph
+    """
+    settings = get_neo4j_settings()
+    return Neo4jGraph(
+        url=settings["url"],
+        username=settings["username"],
+        password=settings["password"],
+        database=settings["database"],
+        driver_config=get_driver_config(config),
+        **graph_kwargs
+    )
+
+
+def create_driver(config: dict = None):
+    """Create a Neo4j driver with the same settings as create_graph.
+
+    For direct execute_query calls (EXPLAIN, PROFILE, timed queries); pass
+    database_=get_neo4j_settings()["database"] so they hit the same database
+    as the Neo4jGraph.
+    """
+    settings = get_neo4j_settings()
+    return GraphDatabase.driver(
+        settings["url"],
+        auth=(settings["username"], settings["password"]),
+        **get_driver_config(config)
+    )
+
+
+def create_async_driver(config: dict = None):
+    """Create an async Neo4j driver with the same settings as create_graph.
+
+    Must be called from inside the event loop that will use the driver.
+    Like create_driver, queries must pass database_ explicitly.
+    """
+    settings = get_neo4j_settings()
+    return AsyncGraphDatabase.driver(
+        settings["url"],
+        auth=(settings["username"], settings["password"]),
+        **get_driver_config(config)
+    )
@@ -0,0 +1,231 @@
+"""
+In-process NumPy Vector Store
+=============================
+
+For a corpus of a few thousand CV chunks, exact search is a single
+matrix-vector product. This store keeps L2-normalized float32 embeddings in
+a memory-mapped `embeddings.npy` file with a JSON metadata sidecar
+(ids, texts, metadata), and answers top-k queries with `argpartition`, with
+no client, database or HNSW layer in between.
+
+It implements the LangChain VectorStore interface (so `as_retriever()` works)
+plus the small collection API NaiveRAGSystem uses for bulk upserts and
+incremental sync (`get`, `upsert`, `delete`, `count`).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _matches(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Chroma-style metadata filter: {"field": value} equality combined with $and / $or."""
+    for key, value in filter.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in value):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, clause) for clause in value):
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact cosine-similarity search over a memory-mapped embedding matrix."""
+
+    def __init__(self, persist_directory: str, embedding_function: Embeddings = None):
+        """Open (or create) a store.
+
+        Args:
+            persist_directory: Directory holding embeddings.npy and metadata.json
+            embedding_function: Embeddings used for queries and add_texts
+        """
+        self.persist_directory = Path(persist_directory)
+        self.embedding_function = embedding_function
+        self._load()
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding_function
+
+    def _load(self) -> None:
+        """Memory-map the embedding matrix and read the metadata sidecar."""
+        matrix_path = self.persist_directory / EMBEDDINGS_FILE
+        metadata_path = self.persist_directory / METADATA_FILE
+
+        if matrix_path.exists() and metadata_path.exists():
+            self.matrix = np.load(matrix_path, mmap_mode="r")
+            with open(metadata_path, encoding="utf-8") as f:
+                sidecar = json.load(f)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+            sidecar = {"ids": [], "documents": [], "metadatas": []}
+
+        self.ids: List[str] = sidecar["ids"]
+        self.documents: List[str] = sidecar["documents"]
+        self.metadatas: List[Dict[str, Any]] = sidecar["metadatas"]
+        self.positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+
+    def _save(self, matrix: np.ndarray) -> None:
+        """Write the matrix and sidecar atomically, then re-map the matrix."""
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+
+        matrix_tmp = self.persist_directory / f"{EMBEDDINGS_FILE}.tmp"
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+
+        metadata_tmp = self.persist_directory / f"{METADATA_FILE}.tmp"
+        with open(metadata_tmp, "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas},
+                      f, ensure_ascii=False)
+
+        self.matrix = None  # Release the old mapping before replacing its file
+        os.replace(matrix_tmp, self.persist_directory / EMBEDDINGS_FILE)
+        os.replace(metadata_tmp, self.persist_directory / METADATA_FILE)
+        self._load()
+
+    # Collection API used by NaiveRAGSystem (mirrors the Chroma collection methods)
+
+    def count(self) -> int:
+        """Number of stored chunks."""
+        return len(self.ids)
+
+    def get(self, include: List[str] = None) -> Dict[str, Any]:
+        """Return all ids with their metadata and documents."""
+        return {"ids": list(self.ids), "metadatas": list(self.metadatas), "documents": list(self.documents)}
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+               metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or replace chunks with precomputed embeddings."""
+        if not ids:
+            return
+        vectors = _normalize(embeddings)
+        matrix = np.array(self.matrix) if len(self.ids) else np.zeros((0, vectors.shape[1]), np.float32)
+
+        new_rows = []
+        for chunk_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+            if chunk_id in self.positions:
+                position = self.positions[chunk_id]
+                matrix[position] = vector
+                self.documents[position] = document
+                self.metadatas[position] = metadata
+            else:
+                self.positions[chunk_id] = len(self.ids)
+                self.ids.append(chunk_id)
+                self.documents.append(document)
+                self.metadatas.append(metadata)
+                new_rows.append(vector)
+
+        if new_rows:
+            matrix = np.vstack([matrix, np.stack(new_rows)])
+        self._save(matrix)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete chunks by id."""
+        remove = {self.positions[chunk_id] for chunk_id in ids or [] if chunk_id in self.positions}
+        if not remove:
+            return True
+
+        keep = [i for i in range(len(self.ids)) if i not in remove]
+        matrix = np.array(self.matrix)[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self._save(matrix)
+        return True
+
+    def reset_collection(self) -> None:
+        """Remove all chunks."""
+        self.ids, self.documents, self.metadatas = [], [], []
+        self._save(np.zeros((0, 0), dtype=np.float32))
+
+    # LangChain VectorStore interface
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed and store texts."""
+        texts = list(texts)
+        ids = ids or [f"chunk-{len(self.ids) + i}" for i in range(len(texts))]
+        metadatas = metadatas or [{} for _ in texts]
+        self.upsert(ids, self.embedding_function.embed_documents(texts), texts, metadatas)
+        return ids
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   persist_directory: str = "./numpy_vector_store", **kwargs: Any) -> "NumpyVectorStore":
+        """Create a store from texts."""
+        store = cls(persist_directory, embedding)
+        store.add_texts(texts, metadatas, ids=kwargs.get("ids"))
+        return store
+
+    def similarity_search_by_vector_with_scores(self, embedding: List[float], k: int = 4,
+                                                filter: Dict[str, Any] = None) -> List[Tuple[Document, float]]:
+        """Exact top-k by cosine similarity: one matrix-vector product plus argpartition.
+
+        Args:
+            embedding: Query embedding
+            k: Number of results
+            filter: Optional metadata filter applied before scoring
+
+        Returns:
+            List of (document, cosine similarity) pairs, best first
+        """
+        if not self.ids:
+            return []
+
+        candidates = None
+        if filter:
+            candidates = np.array([i for i, metadata in enumerate(self.metadatas) if _matches(metadata, filter)],
+                                  dtype=np.int64)
+            if candidates.size == 0:
+                return []
+
+        query = _normalize(embedding)
+        matrix = self.matrix if candidates is None else self.matrix[candidates]
+        scores = matrix @ query
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k] if k < scores.shape[0] else np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top])]
+        positions = top if candidates is None else candidates[top]
+
+        return [
+            (Document(page_content=self.documents[p], metadata=self.metadatas[p], id=self.ids[p]), float(scores[t]))
+            for p, t in zip(positions, top)
+        ]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Dict[str, Any] = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_scores(embedding, k, filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     filter: Dict[str, Any] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_scores(self.embedding_function.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Dict[str, Any] = None,
+                          **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities in [-1, 1]
+        return lambda score: (score + 1) / 2
@@ -0,0 +1,262 @@
+"""
+Cypher Prompt Builder
+=====================
+
+The Cypher generation prompt used to carry the whole graph schema and every
+few-shot example for each question. The builder slims it down:
+
+- the schema keeps only the labels relevant to the question (detected from
+  keywords and from entity names found in the graph vocabulary) and the
+  relationships between them,
+- the few-shot examples are the k most similar ones from a larger bank,
+  ranked by word overlap and shared labels (no embedding call needed).
+"""
+
+import re
+import math
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+from utils.context_budget import count_tokens
+from utils.entity_search import ENTITY_FULLTEXT_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Every answer is about people, so Person is always part of the schema
+CORE_LABELS = {"Person"}
+
+# Word prefixes that make a label relevant to the question
+LABEL_KEYWORDS = {
+    "Skill": ["skill", "programm", "language", "framework", "technolog", "tool", "expert",
+              "know", "develop", "stack", "technical"],
+    "Company": ["compan", "employ", "work", "job", "experience", "colleague", "industry", "career"],
+    "University": ["universit", "stud", "degree", "educat", "graduat", "school", "college", "alumni"],
+    "Location": ["locat", "based", "city", "cities", "countr", "live", "where", "region"],
+    "Certification": ["certif", "credential", "licen", "provider"],
+}
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "at", "on", "to", "for", "and", "or", "with", "by", "is", "are",
+    "do", "does", "we", "have", "has", "who", "what", "which", "how", "many", "much", "all", "any",
+    "find", "list", "show", "me", "our", "there", "their", "most", "people", "person",
+}
+
+# Few-shot bank; each generation prompt gets the k most similar examples
+EXAMPLE_BANK = [
+    {"question": "How many Python programmers do we have?",
+     "cypher": 'MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)\nWHERE s.key = $skill\nRETURN count(p) AS pythonProgrammers\n'
+               '// params: {"skill": "python"}'},
+    {"question": "Who has React skills?",
+     "cypher": 'MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)\nWHERE s.key = $skill\nRETURN p.id AS name\n'
+               '// params: {"skill": "react"}'},
+    {"question": "Find people with both Python and Django skills",
+     "cypher": 'MATCH (p:Person)-[:HAS_SKILL]->(s1:Skill), (p)-[:HAS_SKILL]->(s2:Skill)\n'
+               'WHERE s1.key = $skill AND s2.key = $other_skill\nRETURN p.id AS name\n'
+               '// params: {"skill": "python", "other_skill": "django"}'},
+    {"question": "Who has Pyhton skills?",
+     "cypher": f'CALL db.index.fulltext.queryNodes("{ENTITY_FULLTEXT_INDEX}", $name) YIELD node, score\n'
+               'WHERE node:Skill\nWITH node AS s ORDER BY score DESC LIMIT 1\n'
+               'MATCH (p:Person)-[:HAS_SKILL]->(s)\nRETURN p.id AS name\n'
+               '// params: {"name": "Pyhton~"}'},
+    {"question": "Who worked at Google Cloud?",
+     "cypher": 'MATCH (p:Person)-[:WORKED_AT]->(c:Company)\nWHERE c.key = $company\nRETURN p.id AS name\n'
+               '// params: {"company": "googlecloud"}'},
+    {"question": "What companies have the most former employees?",
+     "cypher": 'MATCH (c:Company)\nRETURN c.id AS company, c.person_count AS people\nORDER BY people DESC LIMIT 10'},
+    {"question": "What are the most common skills?",
+     "cypher": 'MATCH (s:Skill)\nRETURN s.id AS skill, s.person_count AS people\nORDER BY people DESC LIMIT 10'},
+    {"question": "How many people are in the knowledge graph?",
+     "cypher": 'MATCH (p:Person)\nRETURN count(p) AS people'},
+    {"question": "Who studied at Stanford University?",
+     "cypher": 'MATCH (p:Person)-[:STUDIED_AT]->(u:University)\nWHERE u.key = $university\nRETURN p.id AS name\n'
+               '// params: {"university": "stanforduniversity"}'},
+    {"question": "Which universities have the most alumni?",
+     "cypher": 'MATCH (u:University)\nRETURN u.id AS university, u.person_count AS alumni\nORDER BY alumni DESC LIMIT 10'},
+    {"question": "Who is located in Berlin?",
+     "cypher": 'MATCH (p:Person)-[:LOCATED_IN]->(l:Location)\nWHERE l.key = $location\nRETURN p.id AS name\n'
+               '// params: {"location": "berlin"}'},
+    {"question": "How many people are in each location?",
+     "cypher": 'MATCH (l:Location)\nRETURN l.id AS location, l.person_count AS people\nORDER BY people DESC'},
+    {"question": "Who has AWS certifications?",
+     "cypher": 'MATCH (p:Person)-[:EARNED]->(c:Certification)\nWHERE c.key CONTAINS $provider\n'
+               'RETURN p.id AS name, c.id AS certification\n'
+               '// params: {"provider": "aws"}'},
+    {"question": "Who has multiple certifications?",
+     "cypher": 'MATCH (p:Person)-[:EARNED]->(c:Certification)\nWITH p, count(c) AS certifications\n'
+               'WHERE certifications > 1\nRETURN p.id AS name, certifications ORDER BY certifications DESC'},
+    {"question": "Which Python developers worked at Microsoft?",
+     "cypher": 'MATCH (s:Skill {key: $skill})<-[:HAS_SKILL]-(p:Person)-[:WORKED_AT]->(c:Company {key: $company})\n'
+               'RETURN p.id AS name\n'
+               '// params: {"skill": "python", "company": "microsoft"}'},
+    {"question": "Find people who studied at the same university as someone who worked at Amazon",
+     "cypher": 'MATCH (a:Person)-[:WORKED_AT]->(:Company {key: $company}), (a)-[:STUDIED_AT]->(u:University)'
+               '<-[:STUDIED_AT]-(p:Person)\nWHERE p <> a\nRETURN DISTINCT p.id AS name, u.id AS university\n'
+               '// params: {"company": "amazon"}'},
+    {"question": "What skills do people who worked at Google have?",
+     "cypher": 'MATCH (c:Company {key: $company})<-[:WORKED_AT]-(p:Person)-[:HAS_SKILL]->(s:Skill)\n'
+               'RETURN s.id AS skill, count(DISTINCT p) AS people ORDER BY people DESC LIMIT 10\n'
+               '// params: {"company": "google"}'},
+    {"question": "Who has the most skills?",
+     "cypher": 'MATCH (p:Person)-[:HAS_SKILL]->(s:Skill)\n'
+               'RETURN p.id AS name, count(s) AS skills ORDER BY skills DESC LIMIT 10'},
+]
+
+CYPHER_LABEL = re.compile(r":\s*([A-Z]\w*)")
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9+#]+", text.lower()) if w not in STOPWORDS]
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(a[w] * b[w] for w in a.keys() & b.keys())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+# Properties that are useless (and large) in a Cypher generation prompt
+HIDDEN_PROPERTIES = {"embedding"}
+
+
+def _format_props(props: List[Dict[str, str]]) -> str:
+    return "{" + ", ".join(
+        f"{prop['property']}: {prop['type']}" for prop in props if prop['property'] not in HIDDEN_PROPERTIES
+    ) + "}"
+
+
+def format_schema(structured_schema: Dict[str, Any], labels: Optional[set] = None,
+                  exclude_types: Tuple[str, ...] = ()) -> str:
+    """Format a structured schema for the prompt, optionally limited to some labels.
+
+    Args:
+        structured_schema: Neo4jGraph.structured_schema
+        labels: Node labels to keep (all if None); relationship types are kept when
+            both of their endpoints are kept
+        exclude_types: Labels and relationship types never shown to the LLM
+
+    Returns:
+        str: Schema text in the GraphCypherQAChain format
+    """
+    def keep_label(label: str) -> bool:
+        return label not in exclude_types and (labels is None or label in labels)
+
+    relationships = [
+        rel for rel in structured_schema.get("relationships", [])
+        if keep_label(rel["start"]) and keep_label(rel["end"]) and rel["type"] not in exclude_types
+    ]
+    rel_types = {rel["type"] for rel in relationships}
+
+    node_props = [
+        f"{label} {_format_props(props)}"
+        for label, props in structured_schema.get("node_props", {}).items() if keep_label(label)
+    ]
+    rel_props = [
+        f"{rel_type} {_format_props(props)}"
+        for rel_type, props in structured_schema.get("rel_props", {}).items() if rel_type in rel_types
+    ]
+    rels = [f"(:{rel['start']})-[:{rel['type']}]->(:{rel['end']})" for rel in relationships]
+
+    return "\n".join([
+        "Node properties are the following:",
+        ",".join(node_props),
+        "Relationship properties are the following:",
+        ",".join(rel_props),
+        "The relationships are the following:",
+        ",".join(rels),
+    ])
+
+
+class PromptBuilder:
+    """Builds the slimmed schema and few-shot block for one question."""
+
+    def __init__(self, k: int = 4, prune_schema: bool = True, exclude_types: Tuple[str, ...] = (),
+                 examples: List[Dict[str, str]] = None):
+        """Initialize the builder.
+
+        Args:
+            k: Number of few-shot examples per prompt
+            prune_schema: Whether to keep only the question's relevant labels
+            exclude_types: Labels and relationship types never shown to the LLM
+            examples: Example bank (defaults to EXAMPLE_BANK)
+        """
+        self.k = k
+        self.prune_schema = prune_schema
+        self.exclude_types = tuple(exclude_types)
+        self.examples = [
+            {**example, "words": Counter(_words(example["question"])),
+             "labels": set(CYPHER_LABEL.findall(example["cypher"]))}
+            for example in (examples or EXAMPLE_BANK)
+        ]
+
+    def relevant_labels(self, question: str, vocabulary: Dict[str, Dict[str, List[str]]] = None) -> set:
+        """Detect the node labels a question refers to.
+
+        Args:
+            question: Natural language question
+            vocabulary: Optional {label: {lowercase name: ids}} of known entities
+
+        Returns:
+            set: Relevant labels (always includes Person)
+        """
+        text = question.lower()
+        words = re.findall(r"[a-z0-9+#]+", text)
+        labels = set(CORE_LABELS)
+
+        for label, prefixes in LABEL_KEYWORDS.items():
+            if any(word.startswith(prefix) for word in words for prefix in prefixes):
+                labels.add(label)
+
+        for label, names in (vocabulary or {}).items():
+            if label in labels:
+                continue
+            if any(len(name) > 1 and re.search(rf"(?<!\w){re.escape(name)}(?!\w)", text) for name in names):
+                labels.add(label)
+
+        return labels
+
+    def select_examples(self, question: str, labels: set = frozenset()) -> List[Dict[str, str]]:
+        """Return the k examples most similar to the question."""
+        words = Counter(_words(question))
+
+        def score(example: Dict[str, Any]) -> float:
+            label_overlap = len(labels & example["labels"]) / len(labels | example["labels"]) if labels else 0
+            return _cosine(words, example["words"]) + 0.5 * label_overlap
+
+        ranked = sorted(self.examples, key=score, reverse=True)
+        return [{"question": e["question"], "cypher": e["cypher"]} for e in ranked[:self.k]]
+
+    def build(self, question: str, structured_schema: Dict[str, Any], full_schema: str,
+              vocabulary: Dict[str, Dict[str, List[str]]] = None) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Build the prompt inputs for one question.
+
+        Args:
+            question: Natural language question
+            structured_schema: Neo4jGraph.structured_schema
+            full_schema: Unpruned schema text (used when nothing specific is detected)
+            vocabulary: Optional entity vocabulary for name detection
+
+        Returns:
+            Tuple of (prompt inputs {"question", "schema", "examples"}, token report)
+        """
+        labels = self.relevant_labels(question, vocabulary)
+
+        schema = full_schema
+        if self.prune_schema and structured_schema and labels != CORE_LABELS:
+            schema = format_schema(structured_schema, labels, self.exclude_types)
+
+        examples = self.select_examples(question, labels)
+        examples_text = "\n\n".join(f"# {e['question']}\n{e['cypher']}" for e in examples)
+
+        report = {
+            "labels": sorted(labels),
+            "schema_tokens": count_tokens(schema),
+            "full_schema_tokens": count_tokens(full_schema),
+            "example_tokens": count_tokens(examples_text),
+            "examples": len(examples),
+        }
+        logger.info(
+            f"Prompt slimmed: schema {report['full_schema_tokens']} -> {report['schema_tokens']} tokens, "
+            f"{len(examples)} examples ({', '.join(report['labels'])})"
+        )
+        return {"question": question, "schema": schema, "examples": examples_text}, report
@@ -0,0 +1,245 @@
+"""
+Slow-query Profiling Log
+========================
+
+Records every Cypher query executed by the GraphRAG system (template or
+LLM-generated) with its wall time, returned rows and, optionally, the db hits
+reported by PROFILE. Records are JSON lines in a rotating local log, and the
+report groups them by query shape so expensive generated queries can be
+fixed with indexes or intent templates.
+
+Usage:
+    uv run python -m utils.query_profiler [--log .cache/query_profile.log] [--top 10]
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import List, Dict, Any, Optional
+import logging
+
+from neo4j import Query
+
+from utils.common import STRING_LITERAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATH = ".cache/query_profile.log"
+
+# Literals are replaced so queries differing only in names share one shape
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def query_shape(cypher: str) -> str:
+    """Reduce a query to its shape: literals replaced by ?, whitespace collapsed."""
+    shape = NUMBER_LITERAL.sub("?", STRING_LITERAL.sub("?", cypher))
+    return " ".join(shape.split())
+
+
+def total_db_hits(profile: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Sum db hits over a PROFILE plan tree."""
+    if not profile:
+        return None
+    hits = profile.get("dbHits", 0) or 0
+    return hits + sum(total_db_hits(child) or 0 for child in profile.get("children", []))
+
+
+class QueryProfiler:
+    """Times Cypher execution and appends one JSON record per query to a rotating log."""
+
+    def __init__(self, log_path: str = DEFAULT_LOG_PATH, max_bytes: int = 5_000_000,
+                 backup_count: int = 3, profile: bool = False, slow_threshold_ms: float = 1000,
+                 database: str = None):
+        """Initialize the profiler.
+
+        Args:
+            log_path: JSON-lines log file
+            max_bytes: Size at which the log is rotated
+            backup_count: Number of rotated files kept
+            profile: Run queries with PROFILE to record db hits
+            slow_threshold_ms: Queries slower than this are also logged as warnings
+            database: Database the queries run against (server default if None)
+        """
+        self.log_path = log_path
+        self.database = database
+        self.profile = profile
+        self.slow_threshold_ms = slow_threshold_ms
+
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        self.log = logging.getLogger(f"{__name__}.records.{os.path.abspath(log_path)}")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        if not self.log.handlers:
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.log.addHandler(handler)
+
+    def record(self, cypher: str, duration_ms: float, rows: Optional[int], db_hits: Optional[int] = None,
+               question: str = None, source: str = None, error: str = None) -> None:
+        """Append one query record to the log."""
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "source": source,
+            "question": question,
+            "cypher": cypher,
+            "duration_ms": round(duration_ms, 2),
+            "rows": rows,
+            "db_hits": db_hits,
+        }
+        if error:
+            entry["error"] = error
+        self.log.info(json.dumps(entry, ensure_ascii=False))
+
+        if duration_ms >= self.slow_threshold_ms:
+            logger.warning(f"Slow Cypher query ({duration_ms:.0f} ms, {rows} rows): {query_shape(cypher)}")
+
+    def run(self, driver, cypher: str, params: Dict[str, Any] = None, question: str = None,
+            source: str = None, timeout: float = None) -> List[Dict[str, Any]]:
+        """Execute a query through a Neo4j driver and record it.
+
+        Args:
+            driver: Neo4j driver
+            cypher: Query to execute
+            params: Query parameters
+            question: Question the query answers (for the report)
+            source: Where the query came from ("template" or "llm")
+            timeout: Transaction timeout in seconds
+
+        Returns:
+            List of records as dicts
+        """
+        rows, db_hits = None, None
+        start = time.perf_counter()
+        try:
+            prefix = "PROFILE " if self.profile else ""
+            records, summary, _ = driver.execute_query(
+                Query(f"{prefix}{cypher}", timeout=timeout), params or {}, database_=self.database
+            )
+            rows = [record.data() for record in records]
+            if self.profile:
+                db_hits = total_db_hits(summary.profile)
+            return rows
+        except Exception as e:
+            self.record(cypher, (time.perf_counter() - start) * 1000, None, None, question, source, str(e))
+            raise
+        finally:
+            if rows is not None:
+                self.record(cypher, (time.perf_counter() - start) * 1000, len(rows), db_hits, question, source)
+
+    async def arun(self, driver, cypher: str, params: Dict[str, Any] = None, question: str = None,
+                   source: str = None, timeout: float = None) -> List[Dict[str, Any]]:
+        """Async counterpart of run for the async Neo4j driver."""
+        rows, db_hits = None, None
+        start = time.perf_counter()
+        try:
+            prefix = "PROFILE " if self.profile else ""
+            records, summary, _ = await driver.execute_query(
+                Query(f"{prefix}{cypher}", timeout=timeout), params or {}, database_=self.database
+            )
+            rows = [record.data() for record in records]
+            if self.profile:
+                db_hits = total_db_hits(summary.profile)
+            return rows
+        except Exception as e:
+            self.record(cypher, (time.perf_counter() - start) * 1000, None, None, question, source, str(e))
+            raise
+        finally:
+            if rows is not None:
+                self.record(cypher, (time.perf_counter() - start) * 1000, len(rows), db_hits, question, source)
+
+
+def read_records(log_path: str = DEFAULT_LOG_PATH) -> List[Dict[str, Any]]:
+    """Read all records from the log and its rotated backups, oldest first."""
+    directory = os.path.dirname(log_path) or "."
+    base = os.path.basename(log_path)
+    if not os.path.isdir(directory):
+        return []
+
+    backups = sorted(
+        (name for name in os.listdir(directory) if re.fullmatch(re.escape(base) + r"\.\d+", name)),
+        key=lambda name: int(name.rsplit(".", 1)[1]),
+        reverse=True
+    )
+
+    records = []
+    for name in backups + [base]:
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def top_slow_queries(log_path: str = DEFAULT_LOG_PATH, limit: int = 10) -> List[Dict[str, Any]]:
+    """Group logged queries by shape and return the slowest shapes.
+
+    Args:
+        log_path: JSON-lines log written by QueryProfiler
+        limit: Number of shapes to return
+
+    Returns:
+        List of per-shape statistics, slowest average wall time first
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for record in read_records(log_path):
+        if record.get("error"):
+            continue
+        shape = query_shape(record.get("cypher", ""))
+        group = groups.setdefault(shape, {
+            "shape": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "total_rows": 0, "db_hits": [], "example_question": record.get("question"),
+            "source": record.get("source")
+        })
+        group["count"] += 1
+        group["total_ms"] += record["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], record["duration_ms"])
+        group["total_rows"] += record.get("rows") or 0
+        if record.get("db_hits") is not None:
+            group["db_hits"].append(record["db_hits"])
+
+    report = []
+    for group in groups.values():
+        db_hits = group.pop("db_hits")
+        report.append({
+            **group,
+            "avg_ms": group["total_ms"] / group["count"],
+            "avg_rows": group["total_rows"] / group["count"],
+            "avg_db_hits": sum(db_hits) / len(db_hits) if db_hits else None,
+        })
+    return sorted(report, key=lambda item: item["avg_ms"], reverse=True)[:limit]
+
+
+def print_report(log_path: str = DEFAULT_LOG_PATH, limit: int = 10) -> None:
+    """Print the top slow query shapes."""
+    report = top_slow_queries(log_path, limit)
+    if not report:
+        print(f"No profiled queries found in {log_path}")
+        return
+
+    print(f"\n🐢 Top {len(report)} slow query shapes ({log_path})")
+    print("=" * 60)
+    for i, item in enumerate(report, 1):
+        db_hits = f", {item['avg_db_hits']:,.0f} db hits" if item["avg_db_hits"] is not None else ""
+        print(f"\n{i}. avg {item['avg_ms']:.0f} ms, max {item['max_ms']:.0f} ms, "
+              f"{item['count']} runs, {item['avg_rows']:.0f} rows{db_hits} [{item['source']}]")
+        if item["example_question"]:
+            print(f"   ❓ {item['example_question']}")
+        print(f"   {item['shape']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the slowest logged Cypher query shapes")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH, help="Query profile log path")
+    parser.add_argument("--top", type=int, default=10, help="Number of query shapes to show")
+    args = parser.parse_args()
+    print_report(args.log, args.top)
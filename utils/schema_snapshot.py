@@ -0,0 +1,86 @@
+"""
+Persisted Graph Schema Snapshot
+===============================
+
+`Neo4jGraph.refresh_schema()` samples the whole graph through APOC, which
+makes every GraphRAG start-up slow. The schema is stored on disk together
+with a fingerprint of the graph (epoch plus label, relationship type and
+property key tokens) and only refreshed when that fingerprint changes.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+import logging
+
+from utils.graph_stats import GRAPH_STATS_LABEL
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_QUERY = f"""
+CALL {{ CALL db.labels() YIELD label RETURN collect(label) AS labels }}
+CALL {{ CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS rel_types }}
+CALL {{ CALL db.propertyKeys() YIELD propertyKey RETURN collect(propertyKey) AS property_keys }}
+OPTIONAL MATCH (s:{GRAPH_STATS_LABEL} {{id: 'global'}})
+RETURN labels, rel_types, property_keys, coalesce(s.epoch, 0) AS epoch
+"""
+
+
+def schema_fingerprint(graph) -> str:
+    """Compute a cheap fingerprint of the graph in a single round trip.
+
+    Args:
+        graph: Neo4jGraph instance
+
+    Returns:
+        str: Hex digest identifying the current graph state
+    """
+    row = graph.query(FINGERPRINT_QUERY)[0]
+    payload = json.dumps({
+        "labels": sorted(row["labels"]),
+        "rel_types": sorted(row["rel_types"]),
+        "property_keys": sorted(row["property_keys"]),
+        "epoch": row["epoch"]
+    })
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_or_refresh_schema(graph, snapshot_path: str) -> bool:
+    """Populate the graph schema from the snapshot, refreshing it only when stale.
+
+    Args:
+        graph: Neo4jGraph instance created with refresh_schema=False
+        snapshot_path: Location of the JSON snapshot
+
+    Returns:
+        bool: True if the snapshot was reused, False if the schema was refreshed
+    """
+    path = Path(snapshot_path)
+    fingerprint = schema_fingerprint(graph)
+
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get("fingerprint") == fingerprint:
+                graph.schema = snapshot["schema"]
+                graph.structured_schema = snapshot["structured_schema"]
+                return True
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable schema snapshot {path}: {e}")
+
+    graph.refresh_schema()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "fingerprint": fingerprint,
+            "created_at": time.time(),
+            "schema": graph.schema,
+            "structured_schema": graph.structured_schema
+        }, f, default=str)
+    tmp_path.replace(path)
+
+    return False
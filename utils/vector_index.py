@@ -0,0 +1,184 @@
+"""
+In-graph Vector Index
+=====================
+
+Ingestion embeds a short summary of every Person (positions, skills,
+companies, education, location, certifications) and the source Document
+nodes, and stores the vectors in Neo4j vector indexes. Semantic retrieval
+and graph filtering then run in a single Cypher query: vector top-k first,
+followed by the structural filters (skill, company, location, certification).
+"""
+
+import os
+from typing import List, Dict, Any, Optional
+import logging
+
+from langchain_openai import AzureOpenAIEmbeddings
+
+logger = logging.getLogger(__name__)
+
+PERSON_VECTOR_INDEX = "person_summary_embedding"
+DOCUMENT_VECTOR_INDEX = "document_embedding"
+EMBEDDING_PROPERTY = "embedding"
+
+# Keeps document embeddings inside the embedding model's input limit
+MAX_DOCUMENT_CHARS = 20000
+
+PERSON_PROFILE_QUERY = """
+MATCH (p:Person) WHERE $ids IS NULL OR p.id IN $ids
+RETURN elementId(p) AS element_id, p.id AS name, p.summary AS previous_summary,
+       p.embedding IS NULL AS missing_embedding,
+       [(p)-[:HOLDS_POSITION]->(j:JobTitle) | j.id] AS positions,
+       [(p)-[:HAS_SKILL]->(s:Skill) | s.id] AS skills,
+       [(p)-[:WORKED_AT]->(c:Company) | c.id] AS companies,
+       [(p)-[:STUDIED_AT]->(u:University) | u.id] AS universities,
+       [(p)-[:LOCATED_IN]->(l:Location) | l.id] AS locations,
+       [(p)-[:EARNED]->(c:Certification) | c.id] AS certifications
+"""
+
+UNEMBEDDED_DOCUMENTS_QUERY = f"""
+MATCH (d:Document) WHERE d.embedding IS NULL AND d.text IS NOT NULL
+RETURN elementId(d) AS element_id, left(d.text, {MAX_DOCUMENT_CHARS}) AS text
+"""
+
+STORE_EMBEDDINGS_QUERY = f"""
+UNWIND $rows AS row
+MATCH (n) WHERE elementId(n) = row.element_id
+SET n.summary = coalesce(row.summary, n.summary)
+WITH n, row
+CALL db.create.setNodeVectorProperty(n, '{EMBEDDING_PROPERTY}', row.embedding)
+"""
+
+# Structural filters applied to the vector candidates; NULL parameters disable a filter
+HYBRID_FILTERS = """
+  ($skills IS NULL OR all(skill IN $skills WHERE EXISTS { (p)-[:HAS_SKILL]->(:Skill {key: skill}) }))
+  AND ($company IS NULL OR EXISTS { (p)-[:WORKED_AT]->(:Company {key: $company}) })
+  AND ($location IS NULL OR EXISTS { (p)-[:LOCATED_IN]->(:Location {key: $location}) })
+  AND ($certification IS NULL OR EXISTS { (p)-[:EARNED]->(c:Certification) WHERE c.key CONTAINS $certification })
+"""
+
+HYBRID_PERSON_QUERY = f"""
+CALL db.index.vector.queryNodes('{PERSON_VECTOR_INDEX}', $candidates, $embedding) YIELD node, score
+WITH node AS p, score
+WHERE {HYBRID_FILTERS}
+RETURN p.id AS name, score, p.summary AS evidence
+ORDER BY score DESC LIMIT $top_k
+"""
+
+HYBRID_DOCUMENT_QUERY = f"""
+CALL db.index.vector.queryNodes('{DOCUMENT_VECTOR_INDEX}', $candidates, $embedding) YIELD node, score
+MATCH (node)-[:MENTIONS]->(p:Person)
+WHERE {HYBRID_FILTERS}
+// Order before collecting so the evidence comes from each person's best-scoring document
+WITH p, node, score ORDER BY score DESC
+WITH p, max(score) AS score, head(collect(left(node.text, 300))) AS evidence
+RETURN p.id AS name, score, evidence
+ORDER BY score DESC LIMIT $top_k
+"""
+
+
+def create_embeddings(config: dict = None) -> AzureOpenAIEmbeddings:
+    """Create the Azure embedding client configured in [vector_index]."""
+    vector_config = (config or {}).get('vector_index', {})
+    return AzureOpenAIEmbeddings(
+        azure_deployment=vector_config.get('embedding_deployment', 'text-embedding-3-small'),
+        openai_api_version="2023-05-15",
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+    )
+
+
+def create_vector_indexes(graph, dimensions: int = 1536) -> None:
+    """Create the Person summary and Document vector indexes."""
+    for index_name, label in [(PERSON_VECTOR_INDEX, "Person"), (DOCUMENT_VECTOR_INDEX, "Document")]:
+        graph.query(
+            f"CREATE VECTOR INDEX {index_name} IF NOT EXISTS "
+            f"FOR (n:{label}) ON (n.{EMBEDDING_PROPERTY}) "
+            f"OPTIONS {{indexConfig: {{`vector.dimensions`: {int(dimensions)}, "
+            f"`vector.similarity_function`: 'cosine'}}}}"
+        )
+
+
+def person_summary(profile: Dict[str, Any]) -> str:
+    """Build the text embedded for a person from their graph neighbourhood."""
+    parts = [profile["name"]]
+    for title, key in [("Positions", "positions"), ("Skills", "skills"), ("Worked at", "companies"),
+                       ("Studied at", "universities"), ("Located in", "locations"),
+                       ("Certifications", "certifications")]:
+        values = sorted(set(filter(None, profile.get(key) or [])))
+        if values:
+            parts.append(f"{title}: {', '.join(values)}")
+    return ". ".join(parts)
+
+
+def _store_embeddings(graph, embeddings, rows: List[Dict[str, Any]], texts: List[str], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        vectors = embeddings.embed_documents(texts[start:start + batch_size])
+        graph.query(STORE_EMBEDDINGS_QUERY, {
+            "rows": [{**row, "embedding": vector} for row, vector in zip(batch, vectors)]
+        })
+
+
+def index_person_summaries(graph, embeddings, person_ids: Optional[List[str]] = None,
+                           batch_size: int = 64) -> int:
+    """Embed the summaries of people whose summary changed or who have no embedding.
+
+    Args:
+        graph: Neo4jGraph instance
+        embeddings: LangChain embeddings client
+        person_ids: People to refresh (all if None)
+        batch_size: Texts per embedding request
+
+    Returns:
+        int: Number of people embedded
+    """
+    rows, texts = [], []
+    for profile in graph.query(PERSON_PROFILE_QUERY, {"ids": person_ids}):
+        summary = person_summary(profile)
+        if profile["missing_embedding"] or summary != profile["previous_summary"]:
+            rows.append({"element_id": profile["element_id"], "summary": summary})
+            texts.append(summary)
+
+    _store_embeddings(graph, embeddings, rows, texts, batch_size)
+    return len(rows)
+
+
+def index_documents(graph, embeddings, batch_size: int = 16) -> int:
+    """Embed source Document nodes that have no embedding yet."""
+    rows, texts = [], []
+    for document in graph.query(UNEMBEDDED_DOCUMENTS_QUERY):
+        rows.append({"element_id": document["element_id"], "summary": None})
+        texts.append(document["text"])
+
+    _store_embeddings(graph, embeddings, rows, texts, batch_size)
+    return len(rows)
+
+
+def hybrid_search(graph, embedding: List[float], top_k: int = 10, candidates: int = 50,
+                  target: str = "person", filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Vector top-k followed by graph filters, in one Cypher round trip.
+
+    Args:
+        graph: Neo4jGraph instance
+        embedding: Query embedding
+        top_k: Number of people returned
+        candidates: Nearest neighbours fetched before filtering
+        target: "person" (summary index) or "document" (source document index)
+        filters: Normalized keys: skills (list), company, location, certification
+
+    Returns:
+        List of {"name", "score", "evidence"} rows
+    """
+    filters = filters or {}
+    params = {
+        "embedding": embedding,
+        "top_k": top_k,
+        "candidates": max(candidates, top_k),
+        "skills": filters.get("skills") or None,
+        "company": filters.get("company"),
+        "location": filters.get("location"),
+        "certification": filters.get("certification"),
+    }
+    query = HYBRID_DOCUMENT_QUERY if target == "document" else HYBRID_PERSON_QUERY
+    return graph.query(query, params)